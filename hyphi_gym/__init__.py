@@ -1,20 +1,35 @@
-from hyphi_gym.wrappers import Monitor
 import re; from functools import reduce
 from gymnasium.envs.registration import register
 
+PHYSICS = ['PointMaze', 'HoleyPlane', 'Fetch'] # MuJoCo-based envs supporting the `Fast` physics profile
+PIXELS = ['GridMaze', 'HoleyGrid', 'FlatGrid'] # Grid envs supporting `Pixels` observations
+
+def __getattr__(name):
+  """Import `Monitor` upon first access, keeping `import hyphi_gym` and `register_envs` free of moviepy, PIL and MuJoCo"""
+  if name == 'Monitor': from hyphi_gym.wrappers import Monitor; return Monitor
+  raise AttributeError(f"module 'hyphi_gym' has no attribute '{name}'")
+
 def register_envs():
-  register(id="HoleyGrid", entry_point="hyphi_gym.envs.HoleyGrid:HoleyGrid")
-  register(id="HoleyPlane", entry_point="hyphi_gym.envs.HoleyGrid:HoleyPlane")
-  register(id="GridMaze", entry_point="hyphi_gym.envs.GridMaze:GridMaze") 
-  register(id="PointMaze", entry_point="hyphi_gym.envs.PointMaze:PointMaze")
-  register(id="FlatGrid", entry_point="hyphi_gym.envs.FlatGrid:FlatGrid")
-  register(id="Fetch", entry_point="hyphi_gym.envs.Fetch:Fetch")
+  register(id="HoleyGrid", entry_point="hyphi_gym.envs.HoleyGrid:HoleyGrid", vector_entry_point="hyphi_gym.envs.HoleyGrid:HoleyGridVector")
+  register(id="HoleyPlane", entry_point="hyphi_gym.envs.HoleyPlane:HoleyPlane", vector_entry_point="hyphi_gym.envs.HoleyPlane:HoleyPlaneVector")
+  register(id="GridMaze", entry_point="hyphi_gym.envs.GridMaze:GridMaze", vector_entry_point="hyphi_gym.envs.GridMaze:GridMazeVector") 
+  register(id="PointMaze", entry_point="hyphi_gym.envs.PointMaze:PointMaze", vector_entry_point="hyphi_gym.envs.PointMaze:PointMazeVector")
+  register(id="FlatGrid", entry_point="hyphi_gym.envs.FlatGrid:FlatGrid", vector_entry_point="hyphi_gym.envs.FlatGrid:FlatGridVector")
+  register(id="Fetch", entry_point="hyphi_gym.envs.Fetch:Fetch", vector_entry_point="hyphi_gym.envs.Fetch:FetchVector")
+
+def make_vec(name:str, num_envs:int=1, **kwargs):
+  """Vector env creation helper, creating the batched `vector_entry_point` of env `name` (see `named`) with `kwargs`.
+  Usage: `hyphi_gym.make_vec('Maze9', 64, seed=42)`, as plain `gym.make_vec` only uses it with `vectorization_mode='custom'`"""
+  import gymnasium as gym; kwargs = {**named(name), **kwargs}; id = kwargs.pop('id')
+  if id not in gym.registry: register_envs()
+  return gym.make_vec(id, num_envs=num_envs, vectorization_mode='custom', vector_kwargs=kwargs)
 
 def named(name):
   """Enviroment creation helper, trasforms string name to make arguments.
   Usage: `gym.make(hyphi_gym.named(name))`
   Supported Envs: Any Sized Grid Mazes and and Holey Grids
-  Supported Options: Sparse, Explore, Random-layout, -target, and -agent placement"""      
+  Supported Options: Sparse, Explore, Fast physics (MuJoCo-based envs), Pixels observations (grid envs), Random-layout, -target, and -agent placement
+  Raises a `ValueError` for options not supported by the env"""      
   level = {}; random = []
   if 'Maze' in name: 
     if 'Mazes' in name: random.append('Layouts')
@@ -36,6 +51,12 @@ def named(name):
     level = {'id': 'Fetch', 'task': ''.join([t for t in TASKS if t in name])}
     name = reduce(lambda n,r: n.replace(r,''), ['Fetch', *TASKS], name)
   args = {'sparse': 'Sparse' in name, 'detailed': 'Detailed' in name, 'explore': 'Explore' in name}
-  name = name.replace('Sparse','').replace('Explore','').replace('Detailed','')
+  if 'Fast' in name: 
+    if level.get('id') not in PHYSICS: raise ValueError(f"The Fast suffix is only supported by {PHYSICS}, not {level.get('id')}")
+    args['physics'] = 'fast'
+  if 'Pixels' in name: 
+    if level.get('id') not in PIXELS: raise ValueError(f"The Pixels suffix is only supported by {PIXELS}, not {level.get('id')}")
+    args['obs_mode'] = 'pixels'
+  name = name.replace('Sparse','').replace('Explore','').replace('Detailed','').replace('Fast','').replace('Pixels','')
   random = [*random, *re.findall('[A-Z][^A-Z]*', name)]
   return {**level, **args, 'random': random, }
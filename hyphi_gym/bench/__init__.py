@@ -0,0 +1,12 @@
+"""Benchmarks for hyphi-gym environments, run individual modules via `python -m hyphi_gym.bench.<module>`"""
+import time; import numpy as np
+
+def timeit(fn, n=100) -> np.ndarray:
+  """Call `fn` `n`-times returning the wall times of each call in seconds"""
+  times = np.empty(n)
+  for i in range(n): start = time.perf_counter(); fn(); times[i] = time.perf_counter() - start
+  return times
+
+def report(label:str, times:np.ndarray) -> str:
+  """Format mean, p50 and p99 of `times` in ms"""
+  return f"{label:<28} mean {times.mean()*1e3:8.3f}ms  p50 {np.percentile(times,50)*1e3:8.3f}ms  p99 {np.percentile(times,99)*1e3:8.3f}ms"
@@ -0,0 +1,117 @@
+"""Throughput and latency suite over the variant grid of `hyphi_gym.named`, each variant measured in a fresh interpreter.
+Reports steps/s (bare and wrapped in a `Monitor`), init time, reset p50/p99, layout generation and randomization time and peak RSS.
+Usage: `python -m hyphi_gym.bench --out baseline.json`, then `python -m hyphi_gym.bench --compare baseline.json --out current.json`
+Select variants via regular expressions, e.g., `python -m hyphi_gym.bench --envs 'Maze(s)?9' HoleyPlane --steps 1000`
+Every run first smoke-checks building, resetting and stepping the vector env of each registered entry point (`--smoke` only)"""
+import argparse; import json; import platform; import re; import subprocess; import sys; import time; import numpy as np
+
+SIZES = [7, 9, 11, 13, 15]
+MODES = ['Sparse', 'Detailed', 'Explore']
+METRICS = { # Metric -> whether higher values are better
+  'steps_per_s': True, 'monitor_steps_per_s': True, 'init_ms': False, 'reset_p50_ms': False, 'reset_p99_ms': False,
+  'generate_ms': False, 'randomize_ms': False, 'peak_rss_mb': False}
+
+def variants() -> list[str]:
+  """Names of all benchmarked variants"""
+  mazes = [f'{env}{s}' for env in ['Maze', 'Mazes'] for s in SIZES]
+  holes = ['HoleyGrid', 'HoleyGridShift', *[f'{env}{s}' for env in ['HoleyGrid', 'HoleyGrids'] for s in SIZES]]
+  random = [f'{env}{r}' for env in ['Maze9', 'HoleyGrid', 'PointMaze9', 'HoleyPlane'] for r in ['Agents', 'Targets']]
+  points = [*[f'PointMaze{s}' for s in SIZES], 'PointMazes9', 'HoleyPlane', 'HoleyPlaneShift', 'HoleyPlanes9']
+  modes = [f'{env}{m}' for env in ['Maze9', 'HoleyGrid', 'PointMaze9', 'HoleyPlane'] for m in MODES]
+  pixels = ['Maze9Pixels', 'Mazes9Pixels', 'HoleyGridPixels']
+  return [*mazes, *holes, 'FlatGrid9', *points, *random, *modes, *pixels, 'FetchReach', 'FetchReachFast']
+
+VECTORS = {'GridMaze': 'Maze9', 'HoleyGrid': 'HoleyGrid', 'FlatGrid': 'FlatGrid9', 'PointMaze': 'PointMaze9', 'HoleyPlane': 'HoleyPlane', 'Fetch': 'FetchReach'}
+
+def smoke(num_envs:int=2) -> dict:
+  """Errors building, resetting and stepping the `vector_entry_point` of every registered env via `hyphi_gym.make_vec` (empty if all pass)"""
+  import gymnasium as gym; import hyphi_gym; hyphi_gym.register_envs(); errors = {}
+  for id, spec in gym.registry.items():
+    if not str(spec.entry_point).startswith('hyphi_gym') or spec.vector_entry_point is None: continue
+    try:
+      assert id in VECTORS, f"No variant to smoke-check, add one to `VECTORS`"
+      envs = hyphi_gym.make_vec(VECTORS[id], num_envs, seed=0); envs.reset(seed=0); envs.step(envs.action_space.sample()); envs.close()
+    except Exception as e: errors[id] = f"{type(e).__name__}: {e}"
+  return errors
+
+def steps_per_s(env, actions:np.ndarray) -> float:
+  """Steps/s of `env` executing `actions` after a warm-up, excluding the resets of terminated or truncated episodes"""
+  def execute(actions) -> float:
+    env.reset(seed=0); duration = 0.0; start = time.perf_counter()
+    for action in actions:
+      _, _, terminated, truncated, _ = env.step(action)
+      if terminated or truncated: duration += time.perf_counter() - start; env.reset(); start = time.perf_counter()
+    return duration + time.perf_counter() - start
+  execute(actions[:len(actions) // 10]); return len(actions) / execute(actions)
+
+def run(name:str, steps:int, resets:int) -> dict:
+  """Worker measuring variant `name`"""
+  import resource; import gymnasium as gym; import hyphi_gym; from hyphi_gym.utils import timing
+  from hyphi_gym.bench import timeit; hyphi_gym.register_envs(); kwargs = hyphi_gym.named(name)
+  timing.enable(); start = time.perf_counter(); env = gym.make(**kwargs, seed=0); init = time.perf_counter() - start
+  env.reset(seed=0); latencies = timeit(env.reset, resets); phases = timing.summary(); timing.enable(False)
+  env.action_space.seed(0); actions = [env.action_space.sample() for _ in range(steps)]
+  result = {'steps_per_s': steps_per_s(env, actions), 'monitor_steps_per_s': steps_per_s(hyphi_gym.Monitor(env), actions),
+    'init_ms': init * 1e3, 'reset_p50_ms': np.percentile(latencies, 50) * 1e3, 'reset_p99_ms': np.percentile(latencies, 99) * 1e3,
+    **{f'{p}_ms': phases[p]['mean_us'] / 1e3 if p in phases else None for p in ['generate', 'randomize']},
+    'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+  env.close(); return {k: v if v is None else round(float(v), 4) for k, v in result.items()}
+
+def environment() -> dict:
+  """Interpreter, library versions and machine of the run"""
+  import os; import gymnasium; import mujoco
+  try: commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip() or None
+  except OSError: commit = None
+  return {'python': platform.python_version(), 'numpy': np.__version__, 'gymnasium': gymnasium.__version__, 'mujoco': mujoco.__version__,
+    'machine': platform.machine(), 'cpus': os.cpu_count(), 'commit': commit, 'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+def compare(results:dict, baseline:dict, tolerance:float) -> list[str]:
+  """Print the relative change of each metric against `baseline`, returning regressions beyond `tolerance`"""
+  regressions = []
+  for name, result in results.items():
+    if (base := baseline.get(name)) is None or 'error' in result or 'error' in base: continue
+    changes = []
+    for metric, higher in METRICS.items():
+      if result.get(metric) is None or not base.get(metric): continue
+      change = result[metric] / base[metric] - 1; worse = -change if higher else change
+      changes.append(f"{metric} {change:+.0%}{' !' if worse > tolerance else ''}")
+      if worse > tolerance: regressions.append(f"{name} {metric} {base[metric]:g} -> {result[metric]:g}")
+    print(f"{name:<20} " + '  '.join(changes))
+  return regressions
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--envs', nargs='+', default=None, help='Regular expressions selecting variants (defaults to all)')
+  parser.add_argument('--steps', type=int, default=2000, help='Number of steps per throughput measurement')
+  parser.add_argument('--resets', type=int, default=100, help='Number of timed resets')
+  parser.add_argument('--out', default=None, help='Json file to write the results to')
+  parser.add_argument('--compare', default=None, help='Json file of baseline results to compare against')
+  parser.add_argument('--tolerance', type=float, default=0.2, help='Relative change of a metric considered a regression')
+  parser.add_argument('--list', action='store_true', help='List the selected variants and exit')
+  parser.add_argument('--smoke', action='store_true', help='Only smoke-check the vector envs and exit')
+  parser.add_argument('--worker', default=None, metavar='NAME', help='Run a single variant (internal)')
+  args = parser.parse_args()
+  if args.worker is not None: print(json.dumps(run(args.worker, args.steps, args.resets) if args.worker != 'smoke' else smoke())); sys.exit()
+  names = [n for n in variants() if args.envs is None or any(re.fullmatch(e, n) for e in args.envs)]
+  if args.list: print(*names, sep='\n'); sys.exit()
+  worker = subprocess.run([sys.executable, '-m', 'hyphi_gym.bench', '--worker', 'smoke'], capture_output=True, text=True)
+  vectors = json.loads(worker.stdout.splitlines()[-1]) if not worker.returncode else {'smoke': worker.stderr.strip().splitlines()[-1]}
+  print(*[f"{id:<20} vector {error}" for id, error in vectors.items()] or ['Vector envs build'], sep='\n')
+  if args.smoke: sys.exit(1 if vectors else 0)
+  results = {}
+  for name in names:
+    worker = subprocess.run([sys.executable, '-m', 'hyphi_gym.bench', '--worker', name, '--steps', str(args.steps),
+      '--resets', str(args.resets)], capture_output=True, text=True)
+    if worker.returncode: results[name] = {'error': worker.stderr.strip().splitlines()[-1]}; print(f"{name:<20} {results[name]['error']}"); continue
+    results[name] = r = json.loads(worker.stdout.splitlines()[-1])
+    print(f"{name:<20} {r['steps_per_s']:9.0f} steps/s  monitor {r['monitor_steps_per_s']:9.0f} steps/s  init {r['init_ms']:8.1f}ms  "
+          f"reset p50 {r['reset_p50_ms']:7.3f}ms p99 {r['reset_p99_ms']:7.3f}ms  rss {r['peak_rss_mb']:6.0f}MB")
+  report = {'environment': environment(), 'settings': {'steps': args.steps, 'resets': args.resets}, 'vectors': vectors, 'results': results}
+  if args.out is not None:
+    with open(args.out, 'w') as f: json.dump(report, f, indent=2)
+  if args.compare is not None:
+    with open(args.compare) as f: baseline = json.load(f)
+    regressions = compare(results, baseline['results'], args.tolerance)
+    print(*(['Regressions:', *regressions] if regressions else ['No regressions']), sep='\n')
+    if regressions: sys.exit(1)
+  if vectors or any('error' in r for r in results.values()): sys.exit(1)
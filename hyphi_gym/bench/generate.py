@@ -0,0 +1,63 @@
+"""Layout generation throughput of the iterative maze and constructive holes generators compared to their former versions.
+Usage: `python -m hyphi_gym.bench.generate --sizes 7 15 31 63 --runs 50`"""
+import argparse; from types import MethodType; import numpy as np
+from hyphi_gym.envs.GridMaze import GridMaze
+from hyphi_gym.envs.HoleyGrid import HoleyGrid
+from hyphi_gym.common.maze import LEVELS
+from hyphi_gym.common.board import *
+from hyphi_gym.bench import timeit
+
+def legacy_generate(self):
+  """Former recursive generator checking visited cells against a list (kept for reference)"""
+  APOS, TPOS = (self.size[0]-2,1), (1,self.size[1]-2)
+  maze, visited = np.full(self.size, CELLS[WALL]), []
+  def visit(position, d=2):
+    maze[position] = CELLS[FIELD]; visited.append(position)
+    while True:
+      actions = [a for a, p in self.iterate_actions(
+          position, d, lambda act, pos, n: self.action_possible(act, pos, n)
+        ).items() if p not in visited]
+      if not len(actions): return
+      action = self.np_random.choice(actions); intermediate = self.newpos(position,action)
+      maze[intermediate] = CELLS[FIELD]; t = visit(self.newpos(intermediate,action),d)
+  visit(APOS); maze[APOS],maze[TPOS] = CELLS[AGENT], CELLS[TARGET];
+  if self.ascii(maze) in LEVELS.get(f'Maze{self.size[0]}', []): return self._generate()
+  return maze
+
+def legacy_holes(self):
+  """Former generator placing holes blindly and regenerating unsolvable layouts (kept for reference)"""
+  board = Board._generate(self); holes = 0; self._count(attempts=1)
+  while holes < sum(self.size)/len(self.size):
+    pos = tuple(self.np_random.integers(low=(1,1),high=([s-1 for s in self.size]),size=(2,)))
+    if board[pos] == CELLS[FIELD]: board[pos] = CELLS[HOLE]; holes += 1
+  if self._validate(board, error=False) > self.max_episode_steps: return legacy_holes(self)
+  return board
+
+def holes(size:int, runs:int, legacy:bool):
+  env = HoleyGrid(level=str(size), random=['Layouts'], seed=0); env.seed(0); reset = lambda: env.generation_stats.update(dict.fromkeys(env.generation_stats, 0))
+  reset(); times = timeit(env._generate, runs); stats = env.generation_stats
+  line = f"Holes{size:<3} constructive {runs/times.sum():9.1f} layouts/s ({stats['attempts']/runs:5.1f} draws, {stats['retries']/runs:4.2f} repairs/layout)"
+  if legacy:
+    env.seed(0); reset(); times = timeit(MethodType(legacy_holes, env), runs)
+    line += f"  legacy {runs/times.sum():9.1f} layouts/s ({env.generation_stats['attempts']/runs:4.2f} boards/layout)"
+  print(line)
+
+def benchmark(size:int, runs:int, recursive:bool):
+  env = GridMaze(size=size, random=['Layouts'], seed=0); env.seed(0); new = [env._generate() for _ in range(runs)]
+  times = timeit(env._generate, runs); line = f"Maze{size:<4} iterative {runs/times.sum():9.1f} mazes/s"
+  if recursive:
+    legacy = MethodType(legacy_generate, env); env.seed(0)
+    try: old = [legacy() for _ in range(runs)]; assert all((o == n).all() for o, n in zip(old, new)), 'Layout mismatch'
+    except RecursionError: line += "  recursive: recursion limit exceeded"
+    else: times = timeit(legacy, runs); line += f"  recursive {runs/times.sum():9.1f} mazes/s"
+  print(line)
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--sizes', nargs='+', default=[7, 9, 11, 13, 15, 31, 63], type=int, help='Maze sizes to benchmark')
+  parser.add_argument('--runs', type=int, default=50, help='Number of mazes per size')
+  parser.add_argument('--skip-recursive', action='store_true', help='Only benchmark the iterative generator')
+  parser.add_argument('--skip-legacy', action='store_true', help='Only benchmark the constructive holes generator')
+  args = parser.parse_args()
+  [benchmark(size, args.runs, not args.skip_recursive) for size in args.sizes]
+  [holes(size, args.runs, not args.skip_legacy) for size in args.sizes]
@@ -0,0 +1,29 @@
+"""Steps/s of Point worlds built from merged wall and floor rectangles compared to one box per cell.
+Also reports active collision geoms, episode outcomes and the observation deviation under identical actions.
+Usage: `python -m hyphi_gym.bench.geoms --envs PointMaze7 PointMaze15 HoleyPlane --steps 5000`"""
+import argparse; import time; import numpy as np
+import gymnasium as gym; import hyphi_gym
+from hyphi_gym.common.point import Point
+
+def benchmark(name:str, steps:int, merge:bool) -> tuple[np.ndarray, dict]:
+  Point.merge_cells = merge; env = gym.make(**hyphi_gym.named(name), seed=0); sim = env.unwrapped
+  actions = np.random.default_rng(0).uniform(-1, 1, (steps, 2)); observations = [env.reset()[0]]; outcomes = {}
+  geoms = int((sim.model.geom_contype[sim.cells] != 0).sum()); start = time.perf_counter()
+  for action in actions:
+    observation, _, terminated, truncated, info = env.step(action); observations.append(observation)
+    if terminated or truncated:
+      reason = info['termination_reason']; outcomes[reason] = outcomes.get(reason, 0) + 1; env.reset()
+  duration = time.perf_counter() - start; env.close()
+  print(f"{name:<14} {'merged' if merge else 'cells':<7} {geoms:4d} geoms {steps/duration:9.0f} steps/s  {outcomes}")
+  return np.array(observations), outcomes
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  default = [f'PointMaze{s}' for s in [7, 9, 11, 13, 15]] + ['HoleyPlane', 'HoleyPlaneShift'] + [f'HoleyPlanes{s}' for s in [7, 9, 11, 13, 15]]
+  parser.add_argument('--envs', nargs='+', default=default, help='Point-based envs')
+  parser.add_argument('--steps', type=int, default=5000, help='Number of env steps per builder')
+  args = parser.parse_args(); hyphi_gym.register_envs()
+  for name in args.envs:
+    (cells, _), (merged, _) = benchmark(name, args.steps, merge=False), benchmark(name, args.steps, merge=True)
+    deviation = np.abs(cells - merged).max(axis=1)
+    print(f"{name:<14} observation deviation: first 100 steps {deviation[:100].max():.1e}, median {np.median(deviation):.1e}")
@@ -0,0 +1,37 @@
+"""Import-time budget check via `python -X importtime`, each scenario run in a fresh interpreter.
+Guards that importing hyphi_gym, registering and creating (non-MuJoCo) envs stays within `--budget` ms of imports
+and loads none of the heavy backends (MuJoCo, Blender, moviepy, PIL), reporting the overhead over importing gymnasium alone.
+Usage: `python -m hyphi_gym.bench.imports --budget 400 --runs 5`, exits non-zero on violations"""
+import argparse; import subprocess; import sys
+
+HEAVY = ['mujoco', 'bpy', 'moviepy', 'PIL']
+SCENARIOS = { # Scenario -> code whose total import time is measured
+  'import': "import hyphi_gym",
+  'register': "import hyphi_gym; hyphi_gym.register_envs()",
+  'grid': "import gymnasium as gym; import hyphi_gym; hyphi_gym.register_envs(); gym.make('GridMaze', size=9, seed=0).reset()",
+  'monitor': "import gymnasium as gym; import hyphi_gym; hyphi_gym.register_envs(); hyphi_gym.Monitor(gym.make('HoleyGrid', seed=0)).reset()",
+  'tiles': "import gymnasium as gym; import hyphi_gym; hyphi_gym.register_envs(); gym.make('GridMaze', size=9, seed=0, render_mode='rgb_array').reset()",
+}
+
+def importtime(code:str) -> tuple[float, set[str]]:
+  """Total import time in ms and top-level packages of all modules imported running `code`"""
+  result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True); assert result.returncode == 0, result.stderr
+  lines = [l.split('|') for l in result.stderr.splitlines() if l.startswith('import time:') and 'cumulative' not in l]
+  total = sum(int(cumulative) for _, cumulative, name in lines if not name.startswith('  ')) / 1e3 # Top-level imports only
+  return total, {name.strip().split('.')[0] for *_, name in lines}
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--scenarios', nargs='+', default=list(SCENARIOS), choices=list(SCENARIOS), help='Scenarios to check')
+  parser.add_argument('--budget', type=float, default=400, help='Maximal total import time per scenario in ms')
+  parser.add_argument('--runs', type=int, default=3, help='Number of runs per scenario, the fastest is reported')
+  args = parser.parse_args(); violations = []
+  fastest = lambda code: min((importtime(code) for _ in range(args.runs)), key=lambda r: r[0])
+  baseline, _ = fastest("import gymnasium"); print(f"{'gymnasium':<10} {baseline:7.1f}ms")
+  for scenario in args.scenarios:
+    ms, modules = fastest(SCENARIOS[scenario]); heavy = [m for m in HEAVY if m in modules]
+    print(f"{scenario:<10} {ms:7.1f}ms ({ms - baseline:+7.1f}ms)  heavy modules: {', '.join(heavy) or '-'}")
+    if ms > args.budget: violations.append(f"{scenario}: {ms:.1f}ms exceeds the budget of {args.budget:.0f}ms")
+    if heavy: violations.append(f"{scenario}: loaded {', '.join(heavy)}")
+  print(*(['Violations:', *violations] if violations else ['Within budget']), sep='\n')
+  if violations: sys.exit(1)
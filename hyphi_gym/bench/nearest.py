@@ -0,0 +1,38 @@
+"""Per-step cost of the nearest-hole query in `Point.state_vector` using the cell-bucket index compared to a linear scan.
+Holes are scattered on square boards with growing hole counts, observations are checked to be bit-identical.
+Envs use the index from `bucket_holes` holes on (a `HoleyPlane` option), which is always forced here.
+Usage: `python -m hyphi_gym.bench.nearest --holes 8 32 128 512 2048 --steps 20000`"""
+import argparse; import time; import numpy as np
+import gymnasium as gym; import hyphi_gym
+from hyphi_gym.common.point import SIZE, hole_index
+
+def legacy(env) -> np.ndarray:
+  """Former `Point.state_vector` scanning all holes"""
+  velocity, agent = env.data.qvel[:2], env.data.qpos[:2]
+  target = env.target[:2] - env.data.qpos[:2]; state = np.concatenate((velocity, agent, target))
+  hole_dist = env.holes - env.data.qpos[:2]; next_hole = hole_dist[np.linalg.norm(hole_dist, axis=1).argmin()]
+  hole_norm = np.clip(next_hole/np.linalg.norm(next_hole, ord=1) * 2, -1, 1) * SIZE / 2
+  return np.concatenate((state, next_hole - hole_norm))
+
+def benchmark(env, holes:int, steps:int, rng:np.random.Generator):
+  side = int(np.ceil((4 * holes)**.5)); env.size = (side, side); cells = rng.choice(side * side, holes, replace=False)
+  env.holes = np.array([env._pos(divmod(c, side)) for c in np.sort(cells)])
+  start = time.perf_counter(); env.hole_buckets = env.holes[hole_index(env.holes, env.size)]; build = time.perf_counter() - start
+  positions = rng.uniform(-side/2, side/2, (steps, 2)); durations, identical = {}, True
+  for name, observe in [('linear', legacy), ('indexed', type(env).state_vector)]:
+    observations, start = [], time.perf_counter()
+    for p in positions: env.data.qpos[:2] = p; observations.append(observe(env))
+    durations[name] = (time.perf_counter() - start) / steps; durations[name+'_obs'] = np.array(observations)
+  identical = np.array_equal(durations.pop('linear_obs'), durations.pop('indexed_obs'))
+  print(f"{holes:5d} holes {side:3d}x{side:<3d} linear {durations['linear']*1e6:6.1f} us  indexed {durations['indexed']*1e6:6.1f} us"
+        f"  (K={env.hole_buckets.shape[2]}, build {build*1e3:.1f} ms)  identical: {identical}")
+  assert identical, "Indexed nearest-hole observations differ from the linear scan"
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--holes', nargs='+', type=int, default=[8, 32, 128, 512, 2048], help='Hole counts to benchmark')
+  parser.add_argument('--steps', type=int, default=20000, help='Number of observations per hole count')
+  args = parser.parse_args(); hyphi_gym.register_envs(); rng = np.random.default_rng(0)
+  env = gym.make(**hyphi_gym.named('HoleyPlane'), seed=0).unwrapped; env.reset()
+  for holes in args.holes: benchmark(env, holes, args.steps, rng)
+  env.close()
@@ -0,0 +1,30 @@
+"""Steps/s of the `fast` physics profile compared to the `default` profile of the MuJoCo-based envs.
+Also reports episode outcomes, returns and how far trajectories drift from the default profile under identical actions.
+Usage: `python -m hyphi_gym.bench.physics --envs PointMaze9 HoleyPlane FetchReach --steps 5000`"""
+import argparse; import time; import numpy as np
+import gymnasium as gym; import hyphi_gym
+
+def benchmark(name:str, steps:int, physics:str) -> tuple[np.ndarray, list]:
+  env = gym.make(**hyphi_gym.named(name), physics=physics, seed=0); sim = env.unwrapped
+  actions = np.random.default_rng(0).uniform(-1, 1, (steps, *env.action_space.shape))
+  observations, outcomes, returns, episode = [env.reset()[0]], {}, [], 0.0; start = time.perf_counter()
+  for action in actions:
+    observation, reward, terminated, truncated, info = env.step(action); observations.append(observation); episode += reward
+    if terminated or truncated:
+      reason = info.get('termination_reason', 'TIME'); outcomes[reason] = outcomes.get(reason, 0) + 1
+      returns.append(episode); episode = 0.0; env.reset()
+  duration = time.perf_counter() - start; env.close()
+  print(f"{sim.name:<22} {steps/duration:9.0f} steps/s  timestep {sim.model.opt.timestep:.3f} x{sim.frame_skip:<3d}"
+        f"return {np.mean(returns or [episode]):8.2f}  {outcomes}")
+  return np.array(observations), returns
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--envs', nargs='+', default=['PointMaze9', 'HoleyPlane', 'FetchReach'], help='MuJoCo-based envs')
+  parser.add_argument('--steps', type=int, default=5000, help='Number of env steps per profile')
+  args = parser.parse_args(); hyphi_gym.register_envs()
+  for name in args.envs:
+    start = time.perf_counter(); default, _ = benchmark(name, args.steps, 'default'); slow = time.perf_counter() - start
+    start = time.perf_counter(); fast, _ = benchmark(name, args.steps, 'fast'); speedup = slow / (time.perf_counter() - start)
+    drift = np.abs(default - fast).max(axis=1)
+    print(f"{name:<22} speedup {speedup:.2f}x  drift: first step {drift[1]:.1e}, first 100 steps {drift[:100].max():.1e}, median {np.median(drift):.1e}")
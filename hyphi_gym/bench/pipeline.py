@@ -0,0 +1,25 @@
+"""MuJoCo calls and throughput per env step of the lazy (dirty-tracking) step pipeline compared to eager forwarding.
+Usage: `python -m hyphi_gym.bench.pipeline --envs PointMaze9 FetchReach --steps 2000`"""
+import argparse; import time; import numpy as np
+import gymnasium as gym; import hyphi_gym
+from hyphi_gym.common.simulation import Simulation
+
+def benchmark(name:str, steps:int, lazy:bool) -> np.ndarray:
+  Simulation.lazy = lazy; env = gym.make(**hyphi_gym.named(name), seed=0); sim = env.unwrapped
+  env.action_space.seed(0); observations = [env.reset()[0]]; actions = [env.action_space.sample() for _ in range(steps)]
+  sim.mj_calls = dict.fromkeys(sim.mj_calls, 0); start = time.perf_counter()
+  for action in actions:
+    observation, _, terminated, truncated, _ = env.step(action); observations.append(observation)
+    if terminated or truncated: observations.append(env.reset()[0])
+  duration = time.perf_counter() - start; calls = '  '.join(f"{k} {v/steps:5.2f}" for k, v in sim.mj_calls.items())
+  print(f"{name:<14} {'lazy' if lazy else 'eager':<6} {steps/duration:8.0f} steps/s  calls/step: {calls}")
+  env.close(); return np.array(observations)
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--envs', nargs='+', default=['PointMaze9', 'HoleyPlane', 'FetchReach'], help='MuJoCo-based envs')
+  parser.add_argument('--steps', type=int, default=2000, help='Number of env steps per pipeline')
+  args = parser.parse_args(); hyphi_gym.register_envs()
+  for name in args.envs:
+    eager, lazy = benchmark(name, args.steps, lazy=False), benchmark(name, args.steps, lazy=True)
+    print(f"{name:<14} max observation deviation {np.abs(eager - lazy).max():.2e}")
@@ -0,0 +1,25 @@
+"""Frame times of the numpy tile renderer (`rgb_array`) compared to the MuJoCo-based `2D` mode of grid envs, and of batched tile rendering.
+Usage: `MUJOCO_GL=egl python -m hyphi_gym.bench.render --envs Maze9 HoleyGrid --resolutions 64 720 --frames 50`"""
+import argparse; import numpy as np
+import gymnasium as gym; import hyphi_gym
+from hyphi_gym.common import tiles; from hyphi_gym.common.grid import Grid
+from hyphi_gym.bench import timeit, report
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--envs', nargs='+', default=['Maze9', 'Maze15', 'HoleyGrid'], help='Grid-based envs')
+  parser.add_argument('--resolutions', nargs='+', type=int, default=[64, 720], help='Square frame resolutions')
+  parser.add_argument('--modes', nargs='+', default=['rgb_array', '2D'], help='Render modes to compare')
+  parser.add_argument('--frames', type=int, default=50, help='Number of timed frames per mode')
+  parser.add_argument('--batch', type=int, default=64, help='Number of boards rendered at once via `tiles.render`')
+  args = parser.parse_args(); hyphi_gym.register_envs()
+  for name in args.envs:
+    for resolution in args.resolutions:
+      for mode in args.modes:
+        Grid.metadata['render_resolution'] = (resolution, resolution) # Read upon init by MuJoCo-based modes
+        env = gym.make(**hyphi_gym.named(name), render_mode=mode, seed=0).unwrapped
+        env.reset(seed=0); env.step(env.action_space.sample())
+        print(report(f"{name} {mode} {resolution}px", timeit(env.render, args.frames))); env.close()
+      boards = np.stack([env.board] * args.batch); headings = np.arange(args.batch) % 4
+      times = timeit(lambda: tiles.render(boards, (resolution, resolution), headings), args.frames) / args.batch
+      print(report(f"{name} batch {resolution}px", times) + f"  (per board of {args.batch})")
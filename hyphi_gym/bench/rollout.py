@@ -0,0 +1,34 @@
+"""Steps/s of batched `Point.rollout` compared to stepping the env via `execute` per rollout from the same state.
+Also reports the deviation of states, rewards and terminations between both.
+Usage: `python -m hyphi_gym.bench.rollout --envs PointMaze9 HoleyPlane --rollouts 256 --horizon 50`"""
+import argparse; import time; import numpy as np
+import gymnasium as gym; import hyphi_gym
+from hyphi_gym.common.point import SNAPSHOT as STATE # Data restored in place for sequential rollouts
+
+def sequential(env, actions:np.ndarray) -> tuple[np.ndarray, ...]:
+  """Rollouts of `actions` via `env.step`, restoring the state and reward buffer after each"""
+  snapshot, buffer, clock = {k: np.copy(getattr(env.data, k)) for k in STATE}, list(env.reward_buffer), env.data.time; results = []
+  for rollout in actions:
+    results.append([env.step(action)[:4] for action in rollout])
+    for k, v in snapshot.items(): getattr(env.data, k)[...] = v
+    env.data.time, env.reward_buffer = clock, list(buffer); env._toggle_target(True)
+  return tuple(np.array([[step[i] for step in r] for r in results]) for i in range(4))
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--envs', nargs='+', default=['PointMaze9', 'HoleyPlane', 'PointMaze9Sparse'], help='Point-based envs')
+  parser.add_argument('--rollouts', type=int, default=256, help='Number of rollouts K')
+  parser.add_argument('--horizon', type=int, default=50, help='Number of steps T per rollout')
+  parser.add_argument('--threads', type=int, default=None, help='Rollout threads (defaults to the number of CPUs)')
+  args = parser.parse_args(); hyphi_gym.register_envs(); rng = np.random.default_rng(0)
+  for name in args.envs:
+    env = gym.make(**hyphi_gym.named(name), seed=0).unwrapped; env.reset(); [env.step(env.action_space.sample()) for _ in range(20)]
+    actions = rng.uniform(-1, 1, (args.rollouts, args.horizon, 2)).astype(np.float32); steps = args.rollouts * args.horizon
+    env.rollout(actions[:1], threads=args.threads); start = time.perf_counter() # Warm up the thread pool
+    batched = env.rollout(actions, threads=args.threads); duration = time.perf_counter() - start
+    start = time.perf_counter(); stepped = sequential(env, actions); baseline = time.perf_counter() - start
+    deviation = [float(np.abs(np.asarray(b, float) - np.asarray(s, float)).max()) for b, s in zip(batched, stepped)]
+    print(f"{name:<18} rollout {steps/duration:9.0f} steps/s  execute {steps/baseline:8.0f} steps/s  ({baseline/duration:.1f}x)"
+          f"  deviation states {deviation[0]:.1e} rewards {deviation[1]:.1e} terminations {deviation[2]:.0f} truncations {deviation[3]:.0f}"
+          f"  terminated {batched[2].any(axis=1).sum()}/{args.rollouts}")
+    env.close()
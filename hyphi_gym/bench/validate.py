@@ -0,0 +1,47 @@
+"""Compare the breadth-first `Board._validate` against the former exhaustive depth-first search.
+Usage: `python -m hyphi_gym.bench.validate --sizes 7 9 11 13 15 --runs 20`"""
+import argparse; from types import MethodType; import numpy as np
+import gymnasium as gym; import hyphi_gym
+from hyphi_gym.common.board import *
+from hyphi_gym.bench import timeit, report
+
+def legacy_validate(self, board, error=True, setup=False):
+  """Former backtracking search trying every simple path up to `self.bound` (kept for reference)"""
+  DIST = self.max_episode_steps+1 
+  b = board.copy(); visited = np.full_like(board, False); m = visited.copy()
+  APOS = self.getpos(b, cell=AGENT); b[tuple(APOS)]=CELLS[FIELD]
+  TPOS = self.getpos(b, cell=TARGET); b[tuple(TPOS)]=CELLS[FIELD]    
+  iter = lambda p: self.iterate_actions(p, condition=self.action_possible).values()
+  acts = lambda p, mask: [a for a in iter(p) if b[a]==CELLS[FIELD] and not mask[a]]
+  def _mask(p): m[tuple(p)] = True; [_mask(n) for n in acts(p,m)]; return m
+  def _findPath(position, target, distance, d):
+    if distance > self.bound: return d # Enforce min path length
+    if all(p==t for p,t in zip(position, target)): return min(distance, d) # Break Condition
+    visited[position] = True; dist = []
+    for pos in acts(position, visited):
+      dist.append(_findPath(pos, target, distance+1, d))
+      if dist[-1] == self.bound: return self.bound
+    visited[position] = False; return min([d, *dist])
+  if _mask(APOS)[tuple(TPOS)]: DIST = _findPath(tuple(APOS), tuple(TPOS), 0, DIST)
+  if error: assert DIST < self.max_episode_steps+1, 'Environment not solvable.\n'+"\n".join(self.ascii(board))
+  if setup: self.tpos = TPOS
+  return DIST
+
+def benchmark(name:str, runs:int):
+  env = gym.make(**hyphi_gym.named(name), seed=42).unwrapped
+  boards = [env.reset(seed=s) and env.board.copy() for s in range(runs)]
+  legacy = MethodType(legacy_validate, env)
+  mismatch = [b for b in boards if legacy(b, error=False) != env._validate(b, error=False)]
+  assert not len(mismatch), f'{name}: optimal path mismatch on\n' + '\n'.join(env.ascii(mismatch[0]))
+  it = iter(boards); print(report(f'{name} validate (dfs)', timeit(lambda: legacy(next(it), error=False), runs)))
+  it = iter(boards); print(report(f'{name} validate (bfs)', timeit(lambda: env._validate(next(it), error=False), runs)))
+  env.reset(seed=0); env._validate = legacy; print(report(f'{name} reset (dfs)', timeit(env.reset, runs)))
+  del env._validate; env.reset(seed=0); print(report(f'{name} reset (bfs)', timeit(env.reset, runs)))
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--sizes', nargs='+', default=[7, 9, 11, 13, 15], type=int, help='Grid sizes to benchmark')
+  parser.add_argument('--envs', nargs='+', default=['Mazes', 'HoleyGrids'], help='Layout-randomized env families')
+  parser.add_argument('--runs', type=int, default=20, help='Number of layouts per size')
+  args = parser.parse_args(); hyphi_gym.register_envs()
+  for size in args.sizes: [benchmark(f'{env}{size}', args.runs) for env in args.envs]
@@ -0,0 +1,39 @@
+"""Memory and steps/s of the thread-pool `SimulationVector` sharing one `MjModel` compared to `AsyncVectorEnv` processes.
+Each variant runs in a fresh interpreter, memory is the proportional set size (PSS) of the interpreter and its workers.
+Usage: `python -m hyphi_gym.bench.vector --envs PointMaze9 FetchReach --num-envs 8 32 128 --steps 200`"""
+import argparse; import subprocess; import sys; import time; import numpy as np
+
+def pss(pid:int) -> float:
+  """Proportional set size of process `pid` and its children in MB"""
+  with open(f'/proc/{pid}/smaps_rollup') as f: memory = sum(int(l.split()[1]) for l in f if l.startswith('Pss:')) / 1024
+  with open(f'/proc/{pid}/task/{pid}/children') as f: return memory + sum(pss(int(c)) for c in f.read().split())
+
+def run(name:str, mode:str, num_envs:int, steps:int) -> tuple[float, float]:
+  """Worker stepping `num_envs` envs `name` vectorized with `mode`, returning steps/s and memory in MB"""
+  import os; import gymnasium as gym; import hyphi_gym; hyphi_gym.register_envs()
+  kwargs = hyphi_gym.named(name); id = kwargs.pop('id')
+  if mode == 'threads': envs = gym.make_vec(id, num_envs=num_envs, vectorization_mode='custom', vector_kwargs={**kwargs, 'seed': 0})
+  else: envs = gym.vector.AsyncVectorEnv([lambda i=i: gym.make(id, **kwargs, seed=i) for i in range(num_envs)])
+  actions = np.random.default_rng(0).uniform(-1, 1, (steps, *envs.action_space.shape)).astype(np.float32)
+  envs.reset(seed=0); start = time.perf_counter()
+  for action in actions: envs.step(action)
+  result = num_envs * steps / (time.perf_counter() - start), pss(os.getpid()); envs.close(); return result
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--envs', nargs='+', default=['PointMaze9', 'HoleyPlane', 'FetchReach'], help='MuJoCo-based envs')
+  parser.add_argument('--num-envs', nargs='+', type=int, default=[8, 32, 128], help='Numbers of batched envs')
+  parser.add_argument('--steps', type=int, default=200, help='Number of vector steps per variant')
+  parser.add_argument('--worker', nargs=3, default=None, metavar=('NAME', 'MODE', 'N'), help='Run a single variant (internal)')
+  args = parser.parse_args()
+  if args.worker is not None: print(*run(args.worker[0], args.worker[1], int(args.worker[2]), args.steps)); sys.exit()
+  for name in args.envs:
+    for n in args.num_envs:
+      results = {}
+      for mode in ['threads', 'async']:
+        worker = subprocess.run([sys.executable, '-m', 'hyphi_gym.bench.vector', '--worker', name, mode, str(n), '--steps',
+          str(args.steps)], capture_output=True, text=True); assert worker.returncode == 0, worker.stderr
+        results[mode] = tuple(map(float, worker.stdout.split()[-2:]))
+      (threads, threads_mb), (processes, processes_mb) = results['threads'], results['async']
+      print(f"{name:<12} {n:4d} envs  threads {threads:8.0f} steps/s {threads_mb:7.0f} MB  "
+            f"async {processes:8.0f} steps/s {processes_mb:7.0f} MB  ({threads/processes:.2f}x speed, {processes_mb/threads_mb:.1f}x memory)")
@@ -0,0 +1,45 @@
+"""Stress check for process-safe world building: many Point envs with different layouts run concurrently in subprocesses,
+each verifying after every reset that its simulation holds its own board (walls raised, holes disabled, agent and target placed).
+Usage: `python -m hyphi_gym.bench.worlds --envs PointMazes9 HoleyPlanes9 --processes 16 --resets 20`"""
+import argparse; import subprocess; import sys; import numpy as np
+from hyphi_gym.common.board import *
+
+def world(env) -> np.ndarray:
+  """Reconstruct the cells of the board held by the simulation of `env` from its (merged) boxes, walls covering the floor"""
+  model, (H, W) = env.model, env.size; cells = np.full(env.size, CELLS[HOLE])
+  active = env.cells[model.geom_contype[env.cells] != 0]; pos, size = model.geom_pos[active], model.geom_size[active]
+  j0, j1 = np.rint(pos[:,0] - size[:,0] + W/2).astype(int), np.rint(pos[:,0] + size[:,0] + W/2).astype(int)
+  i0, i1 = np.rint(H/2 - pos[:,1] - size[:,1]).astype(int), np.rint(H/2 - pos[:,1] + size[:,1]).astype(int)
+  for k in np.argsort(pos[:,2]): cells[i0[k]:i1[k], j0[k]:j1[k]] = CELLS[WALL] if pos[k,2] > 0 else CELLS[FIELD]
+  return cells
+
+def check(name:str, seed:int, resets:int) -> tuple[int,int]:
+  """Worker resetting env `name` seeded with `seed` `resets`-times, returning the number of layouts and mismatching worlds"""
+  import gymnasium as gym; import hyphi_gym; hyphi_gym.register_envs()
+  env = gym.make(**hyphi_gym.named(name), seed=seed).unwrapped; mismatches, layouts = 0, set()
+  for _ in range(resets):
+    env.reset(); board = np.where(np.isin(env.board, [CELLS[AGENT], CELLS[TARGET]]), CELLS[FIELD], env.board)
+    agent, target = env.data.qpos[:2], env.model.site_pos[env.target_id][:2]
+    placed = np.linalg.norm(agent - env._pos(env.getpos(env.board))) <= env.position_noise * 2**.5 and \
+             np.linalg.norm(target - env._pos(env.getpos(env.board, TARGET))) <= env.position_noise * 2**.5
+    mismatches += int(not (world(env) == board).all() or not placed); layouts.add(board.tobytes())
+  env.close(); return len(layouts), mismatches
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--envs', nargs='+', default=['PointMazes9', 'HoleyPlanes9'], help='Layout-randomized Point envs')
+  parser.add_argument('--processes', type=int, default=16, help='Number of concurrent subprocesses per env')
+  parser.add_argument('--resets', type=int, default=20, help='Number of resets (i.e., layouts) per subprocess')
+  parser.add_argument('--worker', nargs=2, default=None, metavar=('NAME', 'SEED'), help='Run a single worker (internal)')
+  args = parser.parse_args()
+  if args.worker is not None: print(*check(args.worker[0], int(args.worker[1]), args.resets)); sys.exit()
+  # Launch all workers as fresh interpreters at once
+  run = lambda name, seed: subprocess.Popen([sys.executable, '-m', 'hyphi_gym.bench.worlds', '--worker', name, str(seed), 
+    '--resets', str(args.resets)], stdout=subprocess.PIPE, text=True)
+  workers = {(name, seed): run(name, seed) for name in args.envs for seed in range(args.processes)}
+  results = {key: tuple(map(int, w.communicate()[0].split())) for key, w in workers.items()}
+  assert all(w.returncode == 0 for w in workers.values()), "Worker failed"
+  for name in args.envs:
+    runs = [r for (n, _), r in results.items() if n == name]; failed = sum(r[1] for r in runs)
+    print(f"{name:<16} {len(runs)} processes  {sum(r[0] for r in runs)} layouts  {failed} mismatching worlds")
+  assert not any(r[1] for r in results.values()), "Simulation worlds do not match their boards"
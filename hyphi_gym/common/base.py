@@ -1,6 +1,7 @@
 import gymnasium as gym; from typing import Optional; import numpy as np
 from gymnasium.utils.seeding import np_random
 from gymnasium.envs.registration import EnvSpec
+from hyphi_gym.utils import timing
 
 # Rewards 
 GOAL, STEP, FAIL = 1/2, -1, -1/2
@@ -19,15 +20,18 @@ class Base(gym.Env):
   • Exploration Mode without reward / target 
   • Supporting randomization upon init (`Agent` and `Target`), or, upon reset (`Agents`, `Targets` and items in `RADD`)
   • Seeding nondeterministic environments
+  • Drawing generated layouts from a pre-generated `corpus` (see `hyphi_gym.utils.corpus`)
   • Generating dynamic spec obejct and env name based on the configuration"""
 
-  _name: str; layout: Optional[np.ndarray] = None
+  _name: str; layout: Optional[np.ndarray] = None; corpus = None; optimal_path: Optional[int] = None
+  max_retries = 100 # Bound for retrying randomizations and generations without a valid solution
 
   def __init__( 
       self, detailed=False, sparse=False, explore=False, can_fail=False,
-      random=[], RADD=[], seed:Optional[int]=None, max_episode_steps=100
+      random=[], RADD=[], seed:Optional[int]=None, max_episode_steps=100, corpus:Optional[str]=None
     ):
     self.max_episode_steps, self._spec = max_episode_steps, {}
+    if corpus is not None: from hyphi_gym.utils.corpus import Corpus; self.corpus = Corpus(corpus)
     self.dynamic_spec = ['nondeterministic', 'max_episode_steps', 'reward_threshold']
     min_return = self.max_episode_steps * STEP + can_fail * FAIL * self.max_episode_steps
     max_return = self.max_episode_steps * GOAL #+ optimal_path * STEP * (self.step_scale == 1)
@@ -42,7 +46,9 @@ class Base(gym.Env):
   @property
   def name(self)->str: 
     """Generates the dynamic environent name"""
-    return ''.join([self._name, *[n.capitalize() for n in ['explore', 'sparse', 'detailed'] if getattr(self,n)], *self.random])
+    physics = [p.capitalize() for p in [getattr(self, 'physics', 'default')] if p != 'default']
+    obs = [o.capitalize() for o in [getattr(self, 'obs_mode', 'board')] if o != 'board']
+    return ''.join([self._name, *[n.capitalize() for n in ['explore', 'sparse', 'detailed'] if getattr(self,n)], *physics, *obs, *self.random])
 
   @property
   def spec(self)->EnvSpec: 
@@ -55,7 +61,7 @@ class Base(gym.Env):
     self._spec = {k:v for k,v in spec.__dict__.items() if k not in ['namespace','name','version']}
 
   def seed(self, seed:Optional[int]=None): 
-    self.np_random, self._seed = np_random(seed)
+    self.np_random, self._seed = np_random(seed); self._seeded = True
     self.layout = self.randomize(self.layout, RAND_KEY, setup = not len(self.rands))
 
   def _validate(self, layout:np.ndarray, error:bool, setup:bool) -> int: 
@@ -67,24 +73,42 @@ class Base(gym.Env):
     Return old and new position"""
     raise(NotImplementedError)
 
+  def _update(self, key:str, oldpos, newpos): 
+    """Overwrite this function to track the position of `key` moved from `oldpos` to `newpos`"""
+
+  @timing.timed('randomize')
   def randomize(self, layout, keys=RAND, setup=False):
     """Helper function to randomize all `keys` in `self.random`. 
-    Randomization can be forced via setup"""
+    Randomization can be forced via setup, unsolvable randomizations are retried up to `max_retries` times.
+    Layouts drawn from the corpus are not validated again unless randomized further"""
     if layout is None and not setup: return None
-    if layout is None and setup: layout = self._generate()
-    if len(random := [r for r in keys if r in self.random]) or setup: 
+    random = [r for r in keys if r in self.random]
+    if layout is None and setup: 
+      layout = self.generate()
+      if self.corpus is not None and not len(random): self.optimal_path, self.reward_threshold = self._entry; return layout
+    if not len(random) and not setup: return layout
+    for _ in range(self.max_retries):
       layout = layout.copy(); [self._randomize(layout, r) for r in random]
       self.reward_threshold = self._reward_threshold(layout.copy(), setup)
-      if self.reward_threshold is None: return self.randomize(layout, keys, setup)
-    return layout
+      if self.reward_threshold is not None: return layout
+    assert False, f"No solvable randomization of {random} found within {self.max_retries} retries"
   
   def _generate(self)->np.ndarray:
     """Random generator function for a layout of self.specs"""
     raise(NotImplementedError)
 
+  @timing.timed('generate')
+  def generate(self)->np.ndarray:
+    """Generate a new layout, drawing from the corpus if provided:
+    The first layout after seeding is the one generated for the seed, subsequent ones are drawn uniformly"""
+    if self.corpus is None: return self._generate()
+    assert self.corpus.size == tuple(self.size), f"Corpus of size {self.corpus.size} does not match {self.size}"
+    seed = self._seed if self._seeded and self._seed in self.corpus else self.corpus.start + int(self.np_random.integers(len(self.corpus)))
+    self._seeded = False; layout, *self._entry = self.corpus.entry(seed); return layout
+
   def _reset(self, layout):
-    layout = self._generate() if self.layout is None else layout if layout is not None else self.layout.copy()
-    layout = self.randomize(layout, RAND_KEYS, setup=self.layout is None) # Setup if generated
+    layout = None if self.layout is None else layout if layout is not None else self.layout.copy()
+    layout = self.randomize(layout, RAND_KEYS, setup=self.layout is None) # Setup and generate if randomized
     return layout
 
   def reset(self, layout=None, **kwargs)->tuple[gym.spaces.Space, dict]:
@@ -96,7 +120,8 @@ class Base(gym.Env):
   def _reward_threshold(self, layout:Optional[np.ndarray]=None, setup=False):
     """Given a layout, calculates the min and max returns"""
     # if self.detailed: return (0, self.max_episode_steps)
-    if (optimal_path := self._validate(layout, error=False, setup=setup)) > self.max_episode_steps: return None
+    with timing.phase('validate'): self.optimal_path = optimal_path = self._validate(layout, error=False, setup=setup)
+    if optimal_path > self.max_episode_steps: return None
     return self.max_episode_steps * GOAL + 1.2 * optimal_path * self.step_scale if layout is not None else 0 * STEP
   
   def execute(self, action:gym.spaces.Space) -> tuple[gym.spaces.Space, dict]: 
@@ -105,9 +130,15 @@ class Base(gym.Env):
   
   def step(self, action:gym.spaces.Space) -> tuple[gym.spaces.Space, float, bool, bool, dict]:
     """Gymnasium compliant fucntion to step the environment with `action` using the internal `_step`"""
+    if timing.ENABLED: # Instrumented path, measuring the phases of the step
+      with timing.phase('step'):
+        with timing.phase('execute'): state, info = self.execute(action)
+        with timing.phase('reward'): return self._reward(state, info)
     state, info = self.execute(action)  # Step the environment 
+    return self._reward(state, info)
 
-    # Calculate the reward 
+  def _reward(self, state:gym.spaces.Space, info:dict) -> tuple[gym.spaces.Space, float, bool, bool, dict]:
+    """Calculate the reward, termination and truncation of the step yielding `state` and `info`"""
     terminated = 'termination_reason' in info
     if self.explore: reward = 0; terminated = False
     elif self.detailed: reward = np.exp(-info['distance'])
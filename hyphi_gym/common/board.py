@@ -1,4 +1,4 @@
-import numpy as np; from typing import Optional, Union
+import numpy as np; from typing import Optional, Union; from collections import deque, OrderedDict
 from hyphi_gym.common.base import Base; import gymnasium as gym
 
 # State Types
@@ -9,6 +9,41 @@ CHARS = list(CELLS.keys());
 # Actions
 UP, RIGHT, DOWN, LEFT = 0, 1, 2, 3; ACTIONS = [UP, RIGHT, DOWN, LEFT] 
 
+def distance_field(free:np.ndarray, source:tuple[int,int]) -> np.ndarray:
+  """Breadth-first distance field of all `free` cells reachable from `source` (-1 if unreachable). 
+  Border cells are never expanded, each free cell is visited once, bounding the cost by the grid size."""
+  H, W = free.shape; mask = np.zeros_like(free, dtype=bool); mask[1:-1,1:-1] = free[1:-1,1:-1]
+  cells, dist = mask.ravel().tolist(), [-1] * (H * W); start = source[0] * W + source[1]
+  if not cells[start]: return np.array(dist).reshape(H, W)
+  dist[start] = 0; queue = deque([start])
+  while queue:
+    p = queue.popleft(); d = dist[p] + 1
+    for n in (p-W, p+1, p+W, p-1):
+      if cells[n] and dist[n] < 0: dist[n] = d; queue.append(n)
+  return np.array(dist).reshape(H, W)
+
+class DistanceCache:
+  """Bounded LRU of per-layout distance tables keyed by the layout's `free` cells. 
+  Tables hold the distance fields of all sources queried so far, turning repeated queries on static layouts into lookups. 
+  Monitor its effectivity via `hits`, `misses` and `info()`."""
+  def __init__(self, maxsize=128): self.maxsize, self.tables, self.hits, self.misses = maxsize, OrderedDict(), 0, 0
+
+  def field(self, free:np.ndarray, source:tuple[int,int]) -> np.ndarray:
+    """Return the (read-only) distance field from `source` on the layout of `free` cells"""
+    key = (free.shape, free.tobytes()); table = self.tables.setdefault(key, {}); self.tables.move_to_end(key)
+    if len(self.tables) > self.maxsize: self.tables.popitem(last=False)
+    if (field := table.get(source)) is not None: self.hits += 1; return field
+    self.misses += 1; field = table[source] = distance_field(free, source).astype(np.int16)
+    field.flags.writeable = False; return field
+
+  def discard(self, free:np.ndarray):
+    """Drop the table of the layout of `free` cells, e.g., of a rejected candidate layout"""
+    self.tables.pop((free.shape, free.tobytes()), None)
+
+  def info(self) -> dict: return {'hits': self.hits, 'misses': self.misses, 'layouts': len(self.tables), 'maxsize': self.maxsize}
+
+  def clear(self): self.tables.clear(); self.hits, self.misses = 0, 0
+
 class Board(Base):
   """Base for grid-based games managing 
   • A `layout` of a variable `size`
@@ -16,9 +51,11 @@ class Board(Base):
   • Navigable with `ACTIONS` ∈ `[UP, RIGHT, DOWN,LEFT]`"""
 
   board: np.ndarray; size:tuple[int,int]; layout:Optional[np.ndarray]=None
+  state: np.ndarray; apos: tuple[int,int]; tpos: tuple[int,int]
+  distance_cache = DistanceCache() # Shared among all boards of this process
 
   def __init__(self, size:tuple[int,int], layout:Optional[list[str]], bound=None, **kwargs):
-    for s in size: assert s % 2 == 1 and 15 >= s >= 7, "Only odd sizes € [7,15] are supported."
+    for s in size: assert s % 2 == 1 and s >= 7, "Only odd sizes ≥ 7 are supported."
     self.layout = self._grid(layout) if layout is not None else None
     self.size = size; self.bound = bound or sum(size) - 6; Base.__init__(self, **kwargs)
 
@@ -36,7 +73,7 @@ class Board(Base):
   
   def newpos(self, position:Union[np.ndarray, tuple[int,int]], action:int, n=1) -> tuple[int,int]:
     """Action helper mutating a `position` tuple by appying `action` `n`-times"""
-    return tuple(np.array(position)+[(-n,0),(0,n),(n,0),(0,-n)][action])
+    delta = [(-n,0),(0,n),(n,0),(0,-n)][action]; return (int(position[0])+delta[0], int(position[1])+delta[1])
 
   def iterate_actions(self, p:tuple[int,int], n=1, condition=lambda act,pos,n: True) -> dict[int,tuple[int,int]]: 
     """Return possible n actions in a bounded box given a position p and their mutated positions"""
@@ -52,31 +89,28 @@ class Board(Base):
     board[(self.size[0] - 2,1)] = CELLS[AGENT]; board[(1,self.size[0] - 2)] = CELLS[TARGET]
     return board
 
+  def distances(self, board:Optional[np.ndarray]=None, cell:str=TARGET) -> np.ndarray:
+    """Cached distance field from `cell` to all cells reachable on the `board` or internal board (-1 if unreachable)"""
+    board = board if board is not None else self.board
+    return self.distance_cache.field(self.free(board), tuple(self.getpos(board, cell=cell).tolist()))
+
+  def free(self, board:np.ndarray) -> np.ndarray: 
+    """Mask of the cells of `board` that can be traversed"""
+    return np.isin(board, [CELLS[FIELD], CELLS[AGENT], CELLS[TARGET]])
+
   def _validate(self, board, error=True, setup=False):
-    DIST = self.max_episode_steps+1 
-    b = board.copy(); visited = np.full_like(board, False); m = visited.copy()
-    APOS = self.getpos(b, cell=AGENT); b[tuple(APOS)]=CELLS[FIELD]
-    TPOS = self.getpos(b, cell=TARGET); b[tuple(TPOS)]=CELLS[FIELD]    
-    iter = lambda p: self.iterate_actions(p, condition=self.action_possible).values()
-    acts = lambda p, mask: [a for a in iter(p) if b[a]==CELLS[FIELD] and not mask[a]]
-    def _mask(p): m[tuple(p)] = True; [_mask(n) for n in acts(p,m)]; return m
-    def _findPath(position, target, distance, d):
-      """Find the path with the shortest distance on board starting from position to target, 
-      using current min distance _d_ and visited states """
-      if distance > self.bound: return d # Enforce min path length
-      if all(p==t for p,t in zip(position, target)): return min(distance, d) # Break Condition
-      visited[position] = True; dist = []
-      for pos in acts(position, visited):
-        dist.append(_findPath(pos, target, distance+1, d))
-        if dist[-1] == self.bound: return self.bound
-      visited[position] = False; return min([d, *dist])
-    if _mask(APOS)[tuple(TPOS)]: DIST = _findPath(tuple(APOS), tuple(TPOS), 0, DIST)
+    """Return the optimal path length from agent to target on `board` (`max_episode_steps+1` if exceeding `self.bound`)
+    Distances are looked up from the static endpoint, i.e., the agent if targets are randomized upon reset, else the target"""
+    DIST = self.max_episode_steps+1; source, dest = (AGENT, TARGET) if 'Targets' in self.random else (TARGET, AGENT)
+    optimal = self.distances(board, cell=source)[tuple(self.getpos(board, cell=dest))]
+    if 0 <= optimal <= self.bound: DIST = min(int(optimal), DIST)
     if error: assert DIST < self.max_episode_steps+1, 'Environment not solvable.\n'+"\n".join(self.ascii(board))
-    if setup: self.tpos = TPOS
+    if setup: self.tpos = tuple(self.getpos(board, cell=TARGET).tolist())
     return DIST
   
   def _update(self, key:str, oldpos, newpos):
     super()._update(key, oldpos, newpos)
+    if key[0] == AGENT: self.apos = newpos
     if key[0] == TARGET: self.tpos = newpos
   
   def _randomize(self, board:np.ndarray, key:str):
@@ -89,5 +123,8 @@ class Board(Base):
     return (oldpos, newpos)
     
   def reset(self, **kwargs)->tuple[gym.spaces.Space, dict]:
-    """Gymnasium compliant function to reset the environment""" 
-    self.board = super().reset(**kwargs); return self.board.flatten(), {}
\ No newline at end of file
+    """Gymnasium compliant function to reset the environment. 
+    Agent and target positions are tracked from here on, with `state` maintained as flat view of the `board`""" 
+    self.board = np.ascontiguousarray(super().reset(**kwargs)); self.state = self.board.reshape(-1)
+    self.apos, self.tpos = tuple(self.getpos(self.board).tolist()), tuple(self.getpos(self.board, TARGET).tolist())
+    return self.state, {}
\ No newline at end of file
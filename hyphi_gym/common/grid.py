@@ -1,47 +1,61 @@
-import gymnasium as gym ; import numpy as np
-from typing import Optional; from os import path
+import gymnasium as gym ; import numpy as np; import math
+from typing import Optional
 
 from hyphi_gym.common.board import *
-from hyphi_gym.common.rendering import Rendering
-from hyphi_gym.common.point import Point
+from hyphi_gym.common.tiles import Tiles, render, update
+from hyphi_gym.utils import timing
 
-class Grid(Rendering, Point): 
+class Grid(Board): 
+  """Discrete board env rendered by a `renderer` composed upon init according to `render_mode`, importing its backend on demand
+  • `rgb_array`: NumPy tile atlas (see `tiles`)
+  • `2D` / `3D`: MuJoCo simulation mirroring the board (see `PointView`)
+  • `blender`: Blender scene (see `Rendering`)"""
   step_scale = 1  # Used for calculating max_episode_steps according to grid size
-  base_xml = path.join(path.dirname(path.realpath(__file__)), "../assets/grid.xml")
 
-  metadata = {"render_modes": ["2D", "3D", "blender"], "render_fps": 5, "render_resolution": (720,720)} 
-  def __init__(self, render_mode:Optional[str]=None, **simargs):
+  metadata = {"render_modes": ["2D", "3D", "blender", "rgb_array"], "render_fps": 5, "render_resolution": (720,720)} 
+  obs_modes = ['board', 'pixels']
+  def __init__(self, render_mode:Optional[str]=None, obs_mode='board', obs_resolution:tuple[int,int]=(64,64), **simargs):
+    """Observing the flat `board` or its `pixels` at `obs_resolution` (h, w) depending on `obs_mode`"""
     assert render_mode is None or render_mode in self.metadata["render_modes"]; self.render_mode = render_mode
-    if render_mode is not None: 
-      self.renderer = Rendering if render_mode == 'blender' else Point
-      rargs = dict(grid=True, render_mode=render_mode, frame_skip=20)
-      self.renderer.__init__(self, **({} if render_mode == 'blender' else rargs))
+    assert obs_mode in self.obs_modes, f"Please choose an obs_mode in {self.obs_modes}"; self.obs_mode = obs_mode
+    if render_mode == 'rgb_array': self.renderer = Tiles(self)
+    elif render_mode == 'blender': from hyphi_gym.common.rendering import Rendering; self.renderer = Rendering(self)
+    elif render_mode is not None: from hyphi_gym.common.point import PointView; self.renderer = PointView(self, render_mode)
     self.observation_space = gym.spaces.MultiDiscrete(np.full(np.prod(self.size), len(CHARS)))
+    if obs_mode == 'pixels': 
+      self.pixels = np.zeros((*obs_resolution, 3), dtype=np.uint8) # Frame of the board, redrawn at changed cells only
+      self.observation_space = gym.spaces.Box(0, 255, shape=self.pixels.shape, dtype=np.uint8, seed=self._seed)
     # self.observation_space = gym.spaces.Box(low=min(CELLS.values()), high=max(CELLS.values()), shape=(np.prod(self.size),), dtype=np.int64, seed=self._seed)
     self.action_space = gym.spaces.Discrete(n=4, seed=self._seed)
         
+  @timing.timed('render')
   def render(self) -> Optional[np.ndarray]:
     """Return rendering of current state as np array if render_mode set"""
     if self.render_mode not in self.metadata['render_modes']: return 
-    return self.renderer.render(self)
+    return self.renderer.render()
+
+  def close(self):
+    if self.render_mode is not None: self.renderer.close()
 
   """Gym API functions"""
   def reset(self, **kwargs)-> tuple[np.ndarray,dict]:
     observation, info = super().reset(**kwargs)
-    if self.render_mode is not None: self.renderer.reset_world(self)
+    if self.render_mode is not None: self.renderer.reset_world()
+    if self.obs_mode == 'pixels': self.pixels[:] = render(self.board, self.pixels.shape[:2]); observation = self.pixels
     return observation, info
 
-  def _distance(self): return np.linalg.norm(self.getpos(self.board) - self.tpos)
+  def _distance(self): return math.sqrt((self.apos[0]-self.tpos[0])**2 + (self.apos[1]-self.tpos[1])**2)
 
   def execute(self, action: int) -> tuple[np.ndarray, dict]:
-    """Helper function to step the environment, executing `action`, returning its consequences"""
-    position = self.getpos(self.board); target = self.newpos(position, action);     
+    """Helper function to step the environment, executing `action`, returning its consequences.
+    Only the cells left and entered are updated, the returned state is a view of the board or pixels (copy to persist)"""
+    position = self.apos; target = self.newpos(position, action)
     field, info = CHARS[self.board[target]], {'distance': self._distance()}
     if field == TARGET: info = {**info, 'termination_reason':'GOAL'}; 
     if field == HOLE: info = {**info, 'termination_reason':'FAIL'}
-    revert = CELLS[TARGET] if all(np.equal(position, self.tpos)) else CELLS[FIELD] 
-    if field is not WALL: self.board[tuple(position)] = revert      # Move Agent 
-    if field in [FIELD, TARGET]: self.board[target] = CELLS[AGENT]  # Update Board 
-    if self.render_mode is not None: self.renderer.update_world(self, action, target, field)
-    return self.board.flatten(), info
-    
\ No newline at end of file
+    revert = CELLS[TARGET] if position == self.tpos else CELLS[FIELD] 
+    if field is not WALL: self.board[position] = revert      # Move Agent 
+    if field in [FIELD, TARGET]: self.board[target] = CELLS[AGENT]; self.apos = target  # Update Board 
+    if self.render_mode is not None: self.renderer.update_world(action, target, field)
+    if self.obs_mode == 'pixels': update(self.pixels, self.board, [position, target]); return self.pixels, info
+    return self.state, info
@@ -21,17 +21,46 @@ class Holes(Board):
   """Gridworld Maze Environment based on hyphi Grid.
   :param level: Configuration to use [Train|Shift]
   :param random: optional list of features to be stochastic supporting layout, agent-, and target-placement"""
+  max_attempts = 1000 # Bound for hole candidates drawn per generated layout
+
   def __init__(self, level:str, random=[], **kwargs): 
+    self.generation_stats = {'layouts': 0, 'attempts': 0, 'rejected': 0, 'retries': 0}
     self._name = f'Holes{level}'; #layout = None if 'Layouts' in random else LEVELS[level]
     layout, size, radd = (LEVELS[level], (7,9), []) if level in LEVELS else (None, (int(level),int(level)), ['Layouts'])
     Board.__init__(self, size=size, layout=layout, random=random, RADD=radd, can_fail=True, **kwargs)
 
   def _generate(self):
-    """Random generator for holey grids, placing mean(size) holes"""
-    board = super()._generate(); holes = 0 
-    while holes < sum(self.size)/len(self.size):
-      pos = tuple(self.np_random.integers(low=(1,1),high=([s-1 for s in self.size]),size=(2,)))
-      if board[pos] == CELLS[FIELD]: board[pos] = CELLS[HOLE]; holes += 1
-    if self._validate(board, error=False) > self.max_episode_steps: return self._generate()
-    return board 
-  
\ No newline at end of file
+    """Constructive generator for holey grids, placing mean(size) holes while keeping the target reachable within the bound:
+    Candidates are placed optimistically and verified once. Unsolvable layouts are repaired by replaying the candidates, 
+    placing holes off all shortest paths directly and those on a shortest path only if a short enough path remains.
+    Candidates are drawn up to `max_attempts` times per layout, restarting up to `max_retries` times (see `generation_stats`)"""
+    holes, limit = sum(self.size)/len(self.size), min(self.bound, self.max_episode_steps)
+    draw = lambda: tuple(self.np_random.integers(low=(1,1),high=([s-1 for s in self.size]),size=(2,)))
+    for _ in range(self.max_retries):
+      board = super()._generate(); placed, candidates = 0, []
+      while placed < holes and len(candidates) < self.max_attempts:
+        candidates.append(pos := draw())
+        if board[pos] == CELLS[FIELD]: board[pos] = CELLS[HOLE]; placed += 1
+      if placed >= holes and self._validate(board, error=False) <= self.max_episode_steps: 
+        self._count(layouts=1, attempts=len(candidates)); return board
+      if placed >= holes: self.distance_cache.discard(self.free(board)) # Keep rejected candidates from evicting used layouts
+      
+      # Repair: replay candidates maintaining the agent and target distance fields
+      board = super()._generate(); placed, attempts, critical = 0, 0, set()
+      A, T = tuple(self.getpos(board, AGENT).tolist()), tuple(self.getpos(board, TARGET).tolist())
+      free = board != CELLS[WALL]; dA, dT = distance_field(free, A), distance_field(free, T)
+      while placed < holes and attempts < self.max_attempts:
+        pos = candidates[attempts] if attempts < len(candidates) else draw(); attempts += 1
+        if board[pos] != CELLS[FIELD] or pos in critical: continue
+        free[pos] = False
+        if dA[pos] >= 0 and dA[pos] + dT[pos] == dA[T]: # On a shortest path: verify the remaining solution
+          if not 0 <= (dist := distance_field(free, A))[T] <= limit: free[pos] = True; critical.add(pos); continue
+          dA, dT = dist, distance_field(free, T)
+        board[pos] = CELLS[HOLE]; placed += 1
+      self._count(layouts=int(placed >= holes), attempts=attempts, rejected=len(critical), retries=1 + int(placed < holes))
+      if placed >= holes: return board
+    assert False, f"Unable to place {holes} holes within {self.max_retries} retries of {self.max_attempts} attempts"
+
+  def _count(self, **counts): 
+    """Accumulate generator statistics"""
+    self.generation_stats = {k: v + counts.get(k, 0) for k, v in self.generation_stats.items()}
@@ -62,28 +62,29 @@ LEVELS = {
 class Maze(Board):
   # Board
   """Gridworld Maze Environment based on hyphi Grid.
-  :param size: (≤15, guarantee solvability within 100 steps (worst for 15: 96))
+  :param size: odd size ≥7, `max_episode_steps` scales with the longest possible path of `(size-1)²/2-2`
   :param random: optional list of features to be stochastic supporting layout, agent-, and target-placement"""
   def __init__(self, size, random=[], prefix='', **kwargs): 
     self.size = size; self._name = f'{prefix}Maze{size}'
-    layout = None if 'Layouts' in random else LEVELS[f"Maze{size}"] # set layout = None for single random generation
+    layout = None if 'Layouts' in random else LEVELS.get(f"Maze{size}") # set layout = None for (single) random generation
     max_path = (self.size-1)**2/2-2; max_steps = math.ceil(max_path * self.step_scale * 1.2 / 100) * 100
     Board.__init__(self, size=(size,size), layout=layout, random=random, RADD=['Layouts'], max_episode_steps=max_steps, bound=int(max_path), **kwargs)
 
   def _generate(self):
-    """Generate random mazes of `self.size` using Kruskal's algorithm. 
+    """Generate random mazes of `self.size` using an iterative randomized depth-first search. 
+    Visited cells are tracked in a set, passages are carved at once after traversal.
     Generated mazes are forced to difer the static configurations above."""
-    APOS, TPOS = (self.size[0]-2,1), (1,self.size[1]-2)
-    maze, visited = np.full(self.size, CELLS[WALL]), []
-    def visit(position, d=2): # Carve out" empty spaces in the maze 
-      maze[position] = CELLS[FIELD]; visited.append(position)
-      while True: # recursively move to neighboring unvisited spaces
-        actions = [a for a, p in self.iterate_actions(
-            position, d, lambda act, pos, n: self.action_possible(act, pos, n)
-          ).items() if p not in visited]
-        if not len(actions): return
-        action = self.np_random.choice(actions); intermediate = self.newpos(position,action)
-        maze[intermediate] = CELLS[FIELD]; t = visit(self.newpos(intermediate,action),d)
-    visit(APOS); maze[APOS],maze[TPOS] = CELLS[AGENT], CELLS[TARGET];
-    if self.ascii(maze) in LEVELS[f'Maze{self.size[0]}']: return self._generate()
+    (H, W), d = self.size, 2; APOS, TPOS = (H-2,1), (1,W-2)
+    maze, visited = np.full(self.size, CELLS[WALL]), {APOS}
+    moves = [(-d,0),(0,d),(d,0),(0,-d)]; possible = lambda p: (p[0]>d, p[1]<W-d-1, p[0]<H-d-1, p[1]>d)
+    stack, carved = [APOS], [APOS]
+    while len(stack): # Move to neighboring unvisited spaces, backtracking if none are left
+      p = stack[-1]; actions = [a for a, ok in zip(ACTIONS, possible(p)) if ok and (p[0]+moves[a][0], p[1]+moves[a][1]) not in visited]
+      if not len(actions): stack.pop(); continue
+      action = actions[self.np_random.integers(len(actions))]; (dy, dx) = moves[action]
+      cell = (p[0]+dy, p[1]+dx); visited.add(cell); stack.append(cell)
+      carved += [(p[0]+dy//2, p[1]+dx//2), cell]
+    maze[tuple(np.array(carved).T)] = CELLS[FIELD] # Carve out" empty spaces in the maze 
+    maze[APOS],maze[TPOS] = CELLS[AGENT], CELLS[TARGET];
+    if self.ascii(maze) in LEVELS.get(f'Maze{H}', []): return self._generate()
     return maze
@@ -1,9 +1,33 @@
-from os import path; import tempfile
+from os import path
 from typing import Optional, Union; import xml.etree.ElementTree as ET
-import numpy as np; from gymnasium import spaces
+import numpy as np; from gymnasium import spaces; from math import floor
 from hyphi_gym.common.simulation import Simulation, get_xml
+from hyphi_gym.common.base import GOAL, STEP, FAIL
+from mujoco import mjtDisableBit, MjData as MujocoData, mj_step as mujoco_step # type: ignore
 from hyphi_gym.common.board import *
 SIZE = 1.0; HEIGHT = 1.0; AGENT_SIZE = 0.3; 
+SNAPSHOT = ['qpos', 'qvel', 'act', 'ctrl', 'qacc_warmstart'] # Data restored in place to start each rollout
+
+def rectangles(mask:np.ndarray) -> list[tuple[int,int,int,int]]:
+  """Greedily cover all `mask` cells with maximal rectangles `(i0,j0,i1,j1)`, extending each to the right, then downwards"""
+  free, (H, W), rects = mask.copy(), mask.shape, []
+  for i, j in zip(*np.nonzero(mask)):
+    if not free[i,j]: continue
+    j1, i1 = j, i
+    while j1 + 1 < W and free[i,j1+1]: j1 += 1
+    while i1 + 1 < H and free[i1+1,j:j1+1].all(): i1 += 1
+    free[i:i1+1,j:j1+1] = False; rects.append((int(i), int(j), int(i1), int(j1)))
+  return rects
+
+def hole_index(holes:np.ndarray, size:tuple[int,int]) -> np.ndarray:
+  """Bucket the `holes` centered on cells of a board of `size` into a `(H,W,K)` array of ascending hole indices per cell,
+  holding all holes that can be nearest to any position within the cell (padded by repeating the last index)"""
+  (H, W), reach = size, SIZE * 2**.5 + 1e-9 # Distances change by at most half a cell diagonal within a cell
+  centers = np.stack(np.meshgrid((np.arange(W) + 0.5) - W/2, H/2 - (np.arange(H) + 0.5)), axis=-1)
+  distance = np.stack([np.linalg.norm(row[:,None] - holes[None], axis=-1) for row in centers])
+  candidate = distance <= distance.min(axis=-1, keepdims=True) + reach; count = candidate.sum(axis=-1, keepdims=True)
+  index = np.argsort(~candidate, axis=-1, kind='stable')[..., :count.max()] # Candidates first in ascending order
+  return np.where(np.arange(index.shape[-1]) < count, index, np.take_along_axis(index, count - 1, axis=-1))
 
 class Point(Simulation):
   """ Base class for Continous Control in Board Games 
@@ -11,11 +35,15 @@ class Point(Simulation):
   step_scale = 10  # Used for calculating max_episode_steps according to grid size
   base_xml = get_xml('point') # path.join(path.dirname(path.realpath(__file__)), "../../assets/point.xml")
   metadata = { "render_modes": [ "2D", "3D" ], "render_resolution": (720,720) }
+  merge_cells = False # Set True to build walls and floor from merged rectangles (except in `grid` mode), not contact-equivalent to one box per cell
+  rollout_pool = None # Thread pool of `rollout`, created upon first use and shut down upon `close`
 
-  def __init__(self, grid=False, render_mode=None, frame_skip=1):
-    """and optionaly `grid` mode"""
-    self.grid = grid; self.holes = []; self.joints = lambda val: dict(zip(['ball_x', 'ball_y', 'ball_z'], val))
-    super().__init__(render_mode=render_mode, position_noise=0.2, frame_skip=frame_skip); 
+  def __init__(self, grid=False, render_mode=None, frame_skip=1, physics='default', bucket_holes:Optional[int]=None):
+    """and optionaly `grid` mode or a `physics` profile. The nearest hole is found by scanning all holes, 
+    querying cell buckets (see `hole_index`) instead is opt-in from `bucket_holes` holes on (~256 per `bench.nearest`),
+    as the shipped layouts hold at most 15 holes, where scanning is as fast"""
+    self.grid, self.bucket_holes = grid, bucket_holes; self.holes = []; self.hole_buckets = None; self.joints = lambda val: dict(zip(['ball_x', 'ball_y', 'ball_z'], val))
+    super().__init__(render_mode=render_mode, position_noise=0.2, frame_skip=frame_skip, physics=physics); 
     self.observation_space = spaces.Box(-np.inf, np.inf, shape=(2 * (4 if len(self.holes) else 3),), dtype=np.float64) 
     bounds = self.model.actuator_ctrlrange.copy().astype(np.float32) # Set Action Space 
     self.action_space = spaces.Box(low=bounds.T[0], high=bounds.T[1], dtype=np.float32)
@@ -25,8 +53,10 @@ class Point(Simulation):
     """Return the position and velocity joint states of the model"""
     assert self.data is not None, "No model loaded"; velocity,agent = self.data.qvel[:2], self.data.qpos[:2]
     target = self.target[:2] - self.data.qpos[:2]; state = np.concatenate((velocity, agent, target))
-    if len(self.holes):
-      hole_dist = self.holes - self.data.qpos[:2]; 
+    if len(self.holes): # Search the holes bucketed for the agent's cell, falling back to all holes off the board
+      (H, W), (x, y), holes = self.size, self.data.qpos[:2], self.holes; i, j = floor(H/2 - y), floor(x + W/2)
+      if self.hole_buckets is not None and 0 <= i < H and 0 <= j < W: holes = self.hole_buckets[i,j]
+      hole_dist = holes - self.data.qpos[:2]; 
       next_hole = hole_dist[np.linalg.norm(hole_dist, axis=1).argmin()]
       hole_norm = np.clip(next_hole/np.linalg.norm(next_hole, ord=1) * 2, -1, 1) * SIZE / 2
       state = np.concatenate((state, next_hole - hole_norm)) #Normalized to compensate delta to the center of the hole
@@ -42,6 +72,50 @@ class Point(Simulation):
     if obs.shape[0] == 8 and (obs[6:8] < 0).all(): info = {**info, 'termination_reason':'FAIL'}
     return obs, info
   
+  def rollout(self, actions:np.ndarray, threads:Optional[int]=None) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Simulate `K` rollouts executing `actions` of shape `(K,T,2)` from a snapshot of the current state on `threads` workers.
+    Returns states `(K,T,obs)`, rewards, terminations and truncations `(K,T)` following `execute` and `Base.step`.
+    The env state is left untouched, rollouts continue past episode ends (mask via `np.logical_or.accumulate`).
+    Each worker steps one `MjData`, restored from the snapshot per rollout, skipping observation and reward logic per step"""
+    assert self.data is not None and self.model is not None; actions = np.clip(np.asarray(actions), -1.0, 1.0)
+    (K, T), model, n = actions.shape[:2], self.model, self.frame_skip
+    snapshot, clock = {key: np.copy(getattr(self.data, key)) for key in SNAPSHOT}, self.data.time
+    qpos, qvel = np.zeros((K, T, self.model.nq)), np.zeros((K, T, self.model.nv))
+    def simulate(rollouts:np.ndarray):
+      data = MujocoData(model); data_qpos, data_qvel, data_ctrl = data.qpos, data.qvel, data.ctrl # One data per worker
+      for k in rollouts: 
+        for key, value in snapshot.items(): getattr(data, key)[:] = value
+        data.time = clock
+        for t, action in enumerate(actions[k]): # Clip velocity and apply control as in `execute`, `mj_step` releases the GIL
+          data_qvel[0], data_qvel[1] = min(max(data_qvel[0], -5.0), 5.0), min(max(data_qvel[1], -5.0), 5.0)
+          data_ctrl[:] = action; mujoco_step(model, data, nstep=n); qpos[k,t], qvel[k,t] = data_qpos, data_qvel
+    if self.rollout_pool is None or (threads and self.rollout_pool._max_workers != threads):
+      from concurrent.futures import ThreadPoolExecutor; from os import cpu_count
+      self.rollout_pool = ThreadPoolExecutor(max_workers=threads or cpu_count() or 1)
+    list(self.rollout_pool.map(simulate, np.array_split(np.arange(K), min(self.rollout_pool._max_workers, K))))
+
+    # Vectorized `state_vector`, termination and reward calculation
+    agent = qpos[...,:2]; target = self.target[:2] - agent; states = [qvel[...,:2], agent, target]
+    if len(self.holes):
+      hole_dist = self.holes - agent[...,None,:]; nearest = np.linalg.norm(hole_dist, axis=-1).argmin(axis=-1)
+      next_hole = np.take_along_axis(hole_dist, nearest[...,None,None], axis=-2)[...,0,:]
+      hole_norm = np.clip(next_hole/np.abs(next_hole).sum(axis=-1, keepdims=True) * 2, -1, 1) * SIZE / 2
+      states.append(next_hole - hole_norm)
+    states = np.concatenate(states, axis=-1); distance = np.linalg.norm(target, axis=-1)
+    fail = qpos[...,2] < -AGENT_SIZE; fail |= (states[...,6:8] < 0).all(axis=-1) if len(self.holes) else False
+    terminated = (distance <= 2*AGENT_SIZE) | fail
+    if self.explore: reward = np.zeros((K, T)); terminated = np.zeros_like(terminated)
+    elif self.detailed: reward = np.exp(-distance)
+    else: reward = STEP + self.max_episode_steps * np.where(terminated, np.where(fail, FAIL, GOAL), 0)
+    steps = len(self.reward_buffer) + np.arange(1, T+1); truncated = np.broadcast_to(steps >= self.max_episode_steps, (K, T))
+    if self.sparse: reward = np.where(terminated | truncated, sum(self.reward_buffer) + np.cumsum(reward, axis=1), 0)
+    return states, reward, terminated, truncated.copy()
+
+  def close(self):
+    """Shut down the rollout threads if started and release the renderer"""
+    if self.rollout_pool is not None: self.rollout_pool.shutdown(); self.rollout_pool = None
+    super().close()
+
   def reset(self, **kwargs):
     """Reset the environment simulation and randomize if needed"""
     assert self.np_random is not None, "Seeding is required"
@@ -55,23 +129,13 @@ class Point(Simulation):
     "azimuth": 135, "elevation": -50, "distance": sum(self.size)/1.125,
     "lookat": np.array([1,-1,1])*sum(self.size)/30} 
 
-  def setup_world(self, layout=None):
-    """Helper function to generate a simulation from a board-based `layout`"""    
-    if (layout := self.layout if layout is None else layout) is None: return 
+  def setup_world(self):
+    """Helper function to generate an in-memory simulation holding one box per cell of `self.size`
+    The boxes are morphed to the board-based layout via `build_world` without recompiling"""
     tree = ET.parse(self.base_xml); worldbody = tree.find(".//worldbody"); assert worldbody is not None
-    lookup = { CELLS[WALL]: WALL, CELLS[FIELD]: FIELD, CELLS[AGENT]: FIELD, CELLS[TARGET]: FIELD}
-    _str = lambda list: ' '.join(map(str,list)); holes = []
-    block = lambda p,cell: ET.SubElement(
-        worldbody, "geom", type="box", material=lookup[cell], 
-        pos=_str([*self._pos(p), (1 if cell==CELLS[WALL] else -1)*HEIGHT/2]), 
-        size=_str([SIZE/2,SIZE/2,HEIGHT/2])
-        # (2 if cell==CELLS[WALL] else 2)
-      ) if cell in lookup.keys() else holes.append(self._pos(p))
-    [block((i,j), cell) for i,row in enumerate(layout) for j, cell in enumerate(row)]
-    self.holes = np.array(holes)
-    # Set initial agent position, velocity and target position, add ground
-    self.i_apos, self.i_avel = self._pos(self.getpos(layout, AGENT)), np.array([0,0])
-    self.i_tpos = self._pos(self.getpos(layout, TARGET))
+    _str = lambda list: ' '.join(map(str,list))
+    for p in np.ndindex(*self.size): ET.SubElement(worldbody, "geom", type="box", material=FIELD, 
+        pos=_str([*self._pos(p), -HEIGHT/2]), size=_str([SIZE/2,SIZE/2,HEIGHT/2]))
     
     asset = tree.find(".//asset"); assert asset is not None  # Add Grid texture and floor plane
     if self.grid:
@@ -81,14 +145,45 @@ class Point(Simulation):
       for part in ['Body', 'Ears', 'Eyes', 'Hat', 'Lamp', 'Mouth', 'White']:
         ET.SubElement(asset, "mesh", file=f'{path.dirname(self.base_xml)}/Agent/{part}.obj')
         ET.SubElement(agent, "geom", mesh=part, material=part, type="mesh")
-
-    with tempfile.TemporaryDirectory() as tmp_dir: self.model_path = path.join(path.dirname(tmp_dir), "world.xml")
-    tree.write(self.model_path)  # Save new xml with maze to a temporary file
+    self.model_xml = ET.tostring(tree.getroot(), encoding='unicode')
   
   def load_world(self):
-    """Helper function to load a generated world from `self.model_path` falling back to `self.base_xml`"""
-    super().load_world()
+    """Helper function to load the generated world from `self.model_xml`, building `self.layout` if available"""
+    super().load_world(); assert self.model is not None
+    self.cells = np.flatnonzero(self.model.geom_bodyid == 0); assert len(self.cells) == np.prod(self.size)
+    self.model.opt.disableflags |= mjtDisableBit.mjDSBL_MIDPHASE # The compiled bounding volumes do not follow morphed boxes
+    self.cell_rgba = self.model.geom_rgba[self.cells].copy()
+    self.cell_mat = {c: self.model.material(m).id for c,m in [(CELLS[WALL], WALL), (CELLS[FIELD], FIELD)]}
     if self.grid: self.agent_id = self.names.body_name2id["Agent"]
+    if self.layout is not None: self.build_world(self.layout)
+
+  def boxes(self, layout:np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return the boxes `(i0,j0,i1,j1)` and their cell types to build `layout` from: 
+    Maximal rectangles of walls and floor slabs without holes (walls covering the floor) if `merge_cells`, else one box per cell"""
+    if not self.grid and self.merge_cells:
+      walls, floor = rectangles(layout == CELLS[WALL]), rectangles(layout != CELLS[HOLE])
+      if len(walls) + len(floor) <= len(self.cells): 
+        return np.array([*walls, *floor]).reshape(-1,4), np.repeat([CELLS[WALL], CELLS[FIELD]], [len(walls), len(floor)])
+    cells = np.array(list(np.ndindex(*self.size))); return np.hstack([cells, cells]), layout.ravel()
+
+  def build_world(self, layout:np.ndarray):
+    """Morph the cell boxes to a board-based `layout`: walls are raised, fields lowered, holes and unused boxes disabled"""
+    assert self.model is not None; model, cells = self.model, self.cells; boxes, types = self.boxes(layout)
+    pad = len(cells) - len(boxes); boxes, types = np.pad(boxes, ((0,pad),(0,0))), np.pad(types, (0,pad), constant_values=CELLS[HOLE])
+    wall, hole = types == CELLS[WALL], types == CELLS[HOLE]; center = (boxes[:,:2] + boxes[:,2:]) / 2 + 0.5
+    size = np.stack([(boxes[:,3] - boxes[:,1] + 1) * SIZE/2, (boxes[:,2] - boxes[:,0] + 1) * SIZE/2, np.full(len(boxes), HEIGHT/2)], axis=1)
+    pos = np.stack([center[:,1] - self.size[1]/2, self.size[0]/2 - center[:,0], np.where(wall, 1, -1) * HEIGHT/2], axis=1)
+    pos[hole,2] = -100 * HEIGHT; rgba = self.cell_rgba.copy(); rgba[hole,3] = 0
+    model.geom_pos[cells], model.geom_size[cells], model.geom_rgba[cells] = pos, size, rgba
+    model.geom_rbound[cells], model.geom_aabb[cells,3:] = np.linalg.norm(size, axis=1), size
+    model.geom_matid[cells] = np.where(hole, -1, np.where(wall, self.cell_mat[CELLS[WALL]], self.cell_mat[CELLS[FIELD]]))
+    model.geom_contype[cells], model.geom_conaffinity[cells] = np.where(hole, 0, 2), np.where(hole, 0, 1)
+    self.holes = np.array([self._pos(p) for p in zip(*np.where(layout == CELLS[HOLE]))])
+    bucketed = self.bucket_holes is not None and len(self.holes) >= self.bucket_holes
+    self.hole_buckets = self.holes[hole_index(self.holes, self.size)] if bucketed else None
+    # Set initial agent position, velocity and target position
+    self.i_apos, self.i_avel = self._pos(self.getpos(layout, AGENT)), np.array([0,0])
+    self.i_tpos = self._pos(self.getpos(layout, TARGET))
 
   def _toggle_target(self, active:Optional[bool]=None): 
     """Toggles activity of the target site, can be forced using `active`"""
@@ -105,11 +200,12 @@ class Point(Simulation):
   
   def reset_world(self):
     """Reset simulation and reposition agent and target to respective `i_pos`"""
-    if self.layout is None: self.setup_world(self.board); self.load_world()
+    if self.layout is None: self.build_world(self.board)
     super().reset_world(); self.target = np.append(self._noisy(self.i_tpos), HEIGHT/2)
     self._toggle_target(True); qpos, qvel = self.agent; self._set_pos(qpos); self._set_vel(qvel)
   
   def _update(self, key:str, oldpos, newpos):
+    super()._update(key, oldpos, newpos)
     if key[0] == AGENT: self.i_apos = self._pos(newpos)
     if key[0] == TARGET: self.i_tpos = self._pos(newpos)
 
@@ -117,3 +213,20 @@ class Point(Simulation):
   def agent(self)->tuple[np.ndarray, np.ndarray]: 
     """Get noisy initial agent position and velocity"""
     return self.joints(self._noisy(self.i_apos)), self.joints(self._noisy(self.i_avel))
+
+class PointView(Point):
+  """MuJoCo simulation mirroring the board of a grid `env` for `2D` and `3D` rendering
+  Board state (e.g., `size`, `layout`, `board`, `apos`) and the env's `np_random` are read from `env`"""
+  base_xml = get_xml('grid')
+
+  def __init__(self, env, render_mode:str):
+    self.env, self.metadata = env, env.metadata
+    super().__init__(grid=True, render_mode=render_mode, frame_skip=20)
+
+  def __getattr__(self, name:str):
+    if name == 'env': raise AttributeError(name)
+    return getattr(self.env, name)
+
+  def reset_world(self):
+    """Reset to the env's current agent and target positions"""
+    self.i_apos, self.i_tpos = self._pos(self.apos), self._pos(self.tpos); super().reset_world()
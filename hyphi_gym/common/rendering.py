@@ -1,66 +1,104 @@
-""" Vizualisation helper to render hyphi-gym board based envs using blender"""
-import tempfile; import time; import os; import math; 
-import numpy as np; from PIL import Image
+""" Vizualisation helper to render hyphi-gym board based envs using blender
+The scene is loaded once per process and kept resident, wall and field objects are pooled and moved upon layout changes,
+frames are read from the compositor's viewer into numpy without touching the disk"""
+import os; import math; import numpy as np
 from hyphi_gym.utils.stdout_redirected import stdout_redirected
 from hyphi_gym.common.board import *
-try: 
+try:
   with stdout_redirected(): import bpy; from mathutils import Vector;                   # type: ignore
 except ImportError as e: raise ImportError(f"{e}. (HINT: you need to install bpy, run `pip install bpy`.)")
 
-SCENE = f'{os.path.dirname(__file__)}/../assets/env.blend'
+SCENE = os.path.realpath(f'{os.path.dirname(__file__)}/../assets/env.blend')
+DISPLAY = {'Standard': 'sRGB', 'Filmic': 'Filmic sRGB', 'AgX': 'AgX Base sRGB'} # View transform -> display encoded color space
+STAGE = {'pool': {WALL: [], FIELD: []}, 'cells': None, 'size': None} # Process-wide state of the resident scene
 
-class Rendering(Board):
-  def __init__(self):
-    """Init blender rendering using `grid` mode by default. If `self.layout` 
+def load_scene():
+  """Open the scene unless resident, resetting the object pool and wiring the compositor's viewer"""
+  if os.path.realpath(bpy.data.filepath or '.') == SCENE: return bpy.context.scene                 # type: ignore
+  with stdout_redirected(): bpy.ops.wm.open_mainfile(filepath=SCENE)                    # type: ignore
+  scene = bpy.context.scene; STAGE.update(pool={WALL: [], FIELD: []}, cells=None, size=None)    # type: ignore
+  for proto in [WALL,FIELD]: bpy.data.objects[proto].hide_render = True                 # type: ignore
+  scene.use_nodes = True; scene.render.use_compositing = True
+  if (tree := getattr(scene, 'node_tree', None)) is not None: wire_viewer(scene, tree) # Compositing node groups (blender 5) fall back to files
+  return scene
+
+def wire_viewer(scene, tree):
+  """Feed the rendered image converted to the display color space of `scene` to a viewer node"""
+  nodes = tree.nodes; layers = next((n for n in nodes if n.type == 'R_LAYERS'), None) or nodes.new('CompositorNodeRLayers')
+  if not any(n.type == 'COMPOSITE' for n in nodes): tree.links.new(layers.outputs['Image'], nodes.new('CompositorNodeComposite').inputs['Image'])
+  spaces = [e.identifier for e in bpy.types.CompositorNodeConvertColorSpace.bl_rna.properties['from_color_space'].enum_items] # type: ignore
+  convert = nodes.new('CompositorNodeConvertColorSpace'); viewer = nodes.new('CompositorNodeViewer'); viewer.use_alpha = False
+  convert.from_color_space = next(s for s in ['scene_linear', 'Linear Rec.709', 'Linear'] if s in spaces) # Renamed across versions
+  convert.to_color_space = DISPLAY.get(scene.view_settings.view_transform, 'sRGB')
+  tree.links.new(layers.outputs['Image'], convert.inputs['Image']); tree.links.new(convert.outputs['Image'], viewer.inputs['Image'])
+
+class Rendering:
+  def __init__(self, env):
+    """Init blender rendering of the board of grid `env`. If `env.layout`
     is not set upon init, use `setup3D(layout)` once available. """
-    with tempfile.TemporaryDirectory() as tmp: self.metadata['tmp'] = tmp
-    ox, oy = (s/20+.25 for s in self.size)
+    self.env = env; ox, oy = (s/20+.25 for s in env.size); self._pixels, self._tmp = np.empty(0, dtype=np.float32), None
     self._bpos = lambda x,y,t: Vector((x*.1-ox,y*.1-oy, -.2 if t == ' ' else -.1))        # type: ignore
 
-    if self.layout is not None: self.setup3D(self.layout)
+    if env.layout is not None: self.setup3D(env.layout)
 
-  def setup3D(self, layout:np.ndarray): 
-    with stdout_redirected(): bpy.ops.wm.open_mainfile(filepath=SCENE)                    # type: ignore
-    self.scene = bpy.context.scene                                                        # type: ignore
-    self._a, self._t = False, False
-    
-    def _place_3D(x, y, t):
-      if t == HOLE: return
-      o = bpy.data.objects[t]                                                             # type: ignore
-      if t in [AGENT, TARGET]: _place_3D(x, y, FIELD)
-      if t == AGENT and not self._a: self._a=True; o = bpy.data.objects['A']
-      elif t == TARGET and not self._t: self._t=True; o = bpy.data.objects['T']
-      else: o = o.copy(); bpy.context.collection.objects.link(o)                          # type: ignore
-      o.location = self._bpos(x,y,t)
-
-    [_place_3D(x, y, CHARS[cell]) for x, row in enumerate(layout) for y, cell in enumerate(row)]
-    for proto in [WALL,FIELD]: bpy.data.objects[proto].hide_render = True                 # type: ignore
-    self.scene.render.resolution_x, self.scene.render.resolution_y = self.metadata['render_resolution']
+  def setup3D(self, layout:np.ndarray):
+    """Place the pooled walls and fields according to `layout`, moving (and adding) only as many as required"""
+    self.scene = load_scene(); cells = {WALL: [], FIELD: []}
+    for x, row in enumerate(layout):
+      for y, cell in enumerate(row):
+        if (t := CHARS[cell]) in cells: cells[t].append((x,y))
+        elif t in [AGENT, TARGET]: cells[FIELD].append((x,y))
+        if t == TARGET: bpy.data.objects['T'].location = self._bpos(x,y,t)              # type: ignore
+    if STAGE['cells'] != cells:
+      for t, positions in cells.items():
+        pool = STAGE['pool'][t]
+        while len(pool) < len(positions): o = bpy.data.objects[t].copy(); bpy.context.collection.objects.link(o); pool.append(o) # type: ignore
+        for o, p in zip(pool, positions): o.location = self._bpos(*p, t); o.hide_render = False
+        for o in pool[len(positions):]: o.hide_render = True
+      STAGE['cells'] = cells
+    size, resolution = tuple(self.env.size), self.env.metadata['render_resolution']
+    if STAGE['size'] == (size, resolution): return
+    self.scene.render.resolution_x, self.scene.render.resolution_y = resolution
     camera = bpy.data.objects['Camera']                                                   # type: ignore
-    cam = { 
+    cam = {
       7: Vector((0.58,0.59,1.22)),                                                        # type: ignore
       8: Vector((0.67,0.70,1.37)),                                                        # type: ignore
       9: Vector((0.82,0.83,1.52)),                                                        # type: ignore
       11: Vector((1.05,1.07,1.85)),                                                       # type: ignore
       13: Vector((1.28,1.30,2.15)),                                                       # type: ignore
       15: Vector((1.52,1.54,2.48))}                                                       # type: ignore
-    camera.location = cam[int(sum(self.size)/len(self.size))]
+    camera.location = cam[int(sum(size)/len(size))]
+    STAGE['size'] = (size, resolution)
 
   def reset_world(self):
     """Reset simulation and reposition agent and target to respective `i_pos`"""
-    if len(self.random) > 0: self.setup3D(self.board) 
-    bpy.data.objects['A'].location = self._bpos(*[ *self.getpos(), 'A'])                    # type: ignore
+    self.setup3D(self.env.board)
+    bpy.data.objects['A'].location = self._bpos(*[ *self.env.apos, 'A'])                     # type: ignore
     bpy.data.objects['A'].rotation_euler = (0,0,0)       # Rotate towards action            # type: ignore
     bpy.data.objects['T'].hide_render = False            # Unhide target                    # type: ignore
     bpy.data.objects['A'].hide_render = False            # Unhide agent                     # type: ignore
-  
+
   def update_world(self, action, mPos, Cell):
     bpy.data.objects['A'].rotation_euler = (0,0,[0.5,0,1.5,1][action] * math.pi)           # type: ignore
     if Cell in [FIELD, TARGET]: bpy.data.objects['A'].location = self._bpos(*[ *mPos, 'A']) # type: ignore
-    if Cell == TARGET: bpy.data.objects['T'].hide_render = True  # Hide Overlap Components # type: ignore 
-    if Cell == HOLE: bpy.data.objects['A'].hide_render = True    # Hide Overlap Components # type: ignore 
-    
-  def render(self): # -> Image 
-    start = time.time(); bpy.ops.render.render(); print(f"Blender Render took {time.time()-start}") # type: ignore
-    bpy.data.images['Render Result'].save_render(self.metadata['tmp']) # type: ignore
-    return Image.open(self.metadata['tmp']).copy()
+    if Cell == TARGET: bpy.data.objects['T'].hide_render = True  # Hide Overlap Components # type: ignore
+    if Cell == HOLE: bpy.data.objects['A'].hide_render = True    # Hide Overlap Components # type: ignore
+
+  def render(self) -> np.ndarray:
+    """Render the current state, reading the display encoded pixels of the viewer node into an RGB array"""
+    with stdout_redirected(): bpy.ops.render.render()                                     # type: ignore
+    if (image := bpy.data.images.get('Viewer Node')) is None: return self._render_file()  # type: ignore
+    (width, height), channels = image.size, image.channels
+    if self._pixels.size != width * height * channels: self._pixels = np.empty(width * height * channels, dtype=np.float32)
+    image.pixels.foreach_get(self._pixels); pixels = self._pixels.reshape(height, width, channels)[::-1, :, :3]
+    return np.clip(pixels * 255 + .5, 0, 255).astype(np.uint8)
+
+  def _render_file(self) -> np.ndarray:
+    """Fallback for blender versions not updating the viewer node in background mode, passing the frame through a temporary file"""
+    import tempfile; from PIL import Image
+    if self._tmp is None: self._tmp = tempfile.TemporaryDirectory()
+    path = os.path.join(self._tmp.name, 'render.png'); bpy.data.images['Render Result'].save_render(path) # type: ignore
+    with Image.open(path) as image: return np.asarray(image.convert('RGB'))
+
+  def close(self):
+    if self._tmp is not None: self._tmp.cleanup(); self._tmp = None
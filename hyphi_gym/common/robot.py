@@ -13,6 +13,7 @@ Args:
 - target_noise (float): range of a uniform distribution for sampling a target
 - frame_skip (int): number of substeps the simulation runs on every call to step (prev: n_substeps)
 - position_noise (float): range of a uniform distribution for sampling initial object positions (prev: obj_range)
+- physics (str): physics profile of the simulation (see `hyphi_gym.common.simulation.PROFILES`)
 - render_mode (str)"""
 
 from typing import Optional; import numpy as np; import gymnasium as gym
@@ -24,23 +25,24 @@ class Robot(Base, Simulation):
   step_scale = 10
   metadata = {"render_modes": ["3D"], "render_resolution": (720,720)}   
   default_cam_config = {"distance": 2, "azimuth": 135, "elevation": -16, "lookat": np.array([1, 0.85, 0.85])}
+  contacts = ['robot0:l_gripper_finger_link', 'robot0:r_gripper_finger_link', 'table0', 'object0']
 
   def __init__(self, agent: Optional[np.ndarray] = np.array([1,1,1]), block_gripper: bool = False,
                continue_task: bool = True, distance_threshold: float = 0.05, has_object: bool = False, 
                target: Optional[np.ndarray] = np.array([1,1,1]), target_in_the_air: bool = True, target_noise: float = 0.25,
-               frame_skip: int = 20, position_noise: float = 0.25, render_mode = None, **kwargs):
+               frame_skip: int = 20, position_noise: float = 0.25, render_mode = None, physics = 'default', **kwargs):
 
     self.agent = agent; self.block_gripper = block_gripper; self.continue_task = continue_task
     if continue_task: kwargs['random'] = ['Targets'];self.detailed=True
     self.distance_threshold = distance_threshold; self.has_object = has_object; self.target = target
     self.target_in_the_air = target_in_the_air; self.target_noise = target_noise; 
-    Simulation.__init__(self, render_mode=render_mode, position_noise=position_noise, frame_skip=frame_skip) 
+    Simulation.__init__(self, render_mode=render_mode, position_noise=position_noise, frame_skip=frame_skip, physics=physics) 
     Base.__init__(self, **kwargs)
     self.observation_space = gym.spaces.Box(-np.inf, np.inf, shape=(13+15*self.has_object,), dtype=np.float64)
     self.action_space = gym.spaces.Box(-1.0, 1.0, shape=(4,), dtype="float32"); self.action_space.seed(self._seed)
 
   def load_world(self):
-    """Helper function to load a generated world from `self.model_path` falling back to `self.base_xml`"""
+    """Helper function to load the world from `self.base_xml` and set the initial robot pose"""
     super().load_world(); initial = {"robot0:slide0": 0.1, "robot0:slide1": 0.73, "robot0:slide2": 0.375}
     if self.has_object: initial = {**initial, "object0:joint": [1.25, 0.53, 0.4, 1, 0, 0, 0],}
     self._set_pos(initial); #self._position_mocap() # Move end effector into position
@@ -65,7 +67,7 @@ class Robot(Base, Simulation):
   def tpos(self):
     target = getattr(self, '_target', self._noisy(self.target, self.target_noise))
     if not self.continue_task and 'Targets' not in self.random: self._target = target
-    self.model.site_pos[self.target_id] = target; self._forward(); return target
+    self.model.site_pos[self.target_id] = target; self.target_pos = target; self._forward(); return target
       
   def _randomize(self, layout:np.ndarray, key:str):
     """Mutation function to randomize the position of `key` in `layout`"""
@@ -88,7 +90,7 @@ class Robot(Base, Simulation):
       obs = np.concatenate([obs, _pos, _rot, _velp, _velr, _rel_pos])
     
     agent = np.squeeze(_pos.copy()) if self.has_object else grip_pos.copy()
-    target = self._get_pos("target")[0]
+    target = self.target_pos.copy() # Static site, equal to its (deferred) world position
     obs = np.concatenate([obs, target])
     return {'obs': obs, 'target': target, 'agent': agent}
   
@@ -112,7 +114,9 @@ class Robot(Base, Simulation):
     return state['obs'], info
 
   # Gym API
-  def render(self): return self.mujoco_renderer.render('rgb_array')
+  def render(self): return Simulation.render(self)
+
+  def close(self): Simulation.close(self)
   
   def reset(self, **kwargs)->tuple[gym.spaces.Space, dict]:
     """Reset the environment simulation and randomize if needed"""
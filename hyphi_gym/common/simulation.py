@@ -6,7 +6,8 @@ Levine. (https://github.com/Farama-Foundation/D4RL)
 Original Code adapted to integrate with hyphi maze generation and env registration
 """
 
-from typing import Optional, Union; import numpy as np; from os import path; import re
+from typing import Optional, Union; import numpy as np; from os import path; import re; import copy
+from collections import OrderedDict; from hyphi_gym.utils import timing
 
 try:
   from mujoco import MjData as MujocoData                           # type: ignore
@@ -21,36 +22,81 @@ except ImportError as e:
   import gymnasium
   raise gymnasium.error.DependencyNotInstalled( f"{e}. (HINT: you need to install mujoco, run `pip install gymnasium[mujoco]`.)")
 
+# Named physics profiles applied to the model at load time, trading fidelity for throughput:
+# solver `iterations` and `tolerance`, timestep multiplied by `coarsen` (dividing `frame_skip` to keep the env dt),
+# and `prune` collisions to geoms of the `contacts` bodies (e.g., the table and the gripper fingers of the robot)
+PROFILES = {'default': {}, 'fast': {'iterations': 10, 'tolerance': 1e-6, 'coarsen': 2, 'prune': True}}
+
 get_xml = lambda task: f"{re.sub('(?<=hyphi_gym).*', '', path.dirname(path.realpath(__file__)))}/assets/{task}.xml"
 
 class Simulation: 
-  """Mujoco Based Simulation Base Class adapted from gymnasium MujocoEnv for target-based hyphi envs"""
+  """Mujoco Based Simulation Base Class adapted from gymnasium MujocoEnv for target-based hyphi envs
+  State mutations mark the simulation dirty, deferring the kinematics pass to the next `mj_step` or `sync()`. 
+  Thus, an env step runs at most one kinematics pass, MuJoCo calls are counted in `mj_calls`."""
 
   base_xml: str; default_cam_config: dict
   data:Optional[MujocoData] = None
   model:Optional[MujocoModel] = None
-  model_path:Optional[str] = None
-
-  def __init__(self, render_mode: Optional[str] = None, frame_skip=1, position_noise=0):
+  model_xml:Optional[str] = None
+  models:OrderedDict = OrderedDict() # Compiled models shared among all simulations of this process
+  model_cache_size = 16
+  _renderer:Optional[MujocoRenderer] = None; _render_key:Optional[tuple] = None
+  lazy = True # Defer kinematics upon state mutations, set False to forward eagerly (former pipeline)
+  post_constraint = False # Run mj_rnePostConstraint after stepping, only needed for contact or force observations
+  contacts:Optional[list[str]] = None # Bodies keeping their collisions in pruning physics profiles (None keeps all)
+
+  def __init__(self, render_mode: Optional[str] = None, frame_skip=1, position_noise=0, physics='default'):
     """Init mujoco simulation using `render_mode` and `frame_skip` to set simpulation fps.
     For state stochasticity use `position_noise`. To generate a model, supply core via `self.base_xml`.
-    Extend `setup_world()` to store an optional model_path, or adapt `load_world()` for specific setup."""
-    self.frame_skip = frame_skip; self.render_mode = render_mode; self.position_noise = position_noise; 
+    Select a `physics` profile from `PROFILES`, coarsening the timestep only where it divides `frame_skip`.
+    Extend `setup_world()` to store an optional in-memory `model_xml`, or adapt `load_world()` for specific setup."""
+    assert physics in PROFILES, f"Unknown physics profile {physics}, choose from {list(PROFILES)}"
+    self.physics, self.profile = physics, PROFILES[physics]; self.coarsen = self.profile.get('coarsen', 1)
+    if frame_skip % self.coarsen: self.coarsen = 1
+    self.frame_skip = frame_skip // self.coarsen; self.render_mode = render_mode; self.position_noise = position_noise; 
     self.width, self.height = self.metadata['render_resolution']; self._target_active = False
-    self.setup_world(); self.load_world(); self.metadata["render_fps"] = int(np.round(1.0 / self.dt))
+    self._dirty, self.mj_calls = True, {'forward': 0, 'step': 0, 'post_constraint': 0}
+    with timing.phase('setup_world'): self.setup_world()
+    with timing.phase('load_world'): self.load_world()
+    self.metadata["render_fps"] = int(np.round(1.0 / self.dt))
 
   def setup_world(self): pass
   
-  def load_xml(self, path):
-    model = MujocoModel.from_xml_path(path); data = MujocoData(model)
+  def load_xml(self, xml:str):
+    """Compile the model of an `xml` string or path, reusing compiled models in a bounded LRU. 
+    Models are copied as they are mutated per simulation"""
+    if (model := self.models.get(xml)) is None:
+      model = MujocoModel.from_xml_string(xml) if xml.lstrip().startswith('<') else MujocoModel.from_xml_path(xml)
+      self.models[xml] = model
+      if len(self.models) > self.model_cache_size: self.models.popitem(last=False)
+    self.models.move_to_end(xml); model = copy.copy(model); data = MujocoData(model)
     return model, data 
 
   def load_world(self):
-    """Helper function to load a generated world from `self.model_path` falling back to `self.base_xml`"""
-    self.model, self.data = self.load_xml(self.model_path or self.base_xml)
+    """Helper function to load a generated world from `self.model_xml` falling back to `self.base_xml`"""
+    self.model, self.data = self.load_xml(self.model_xml or self.base_xml)
     self.model.vis.global_.offwidth, self.model.vis.global_.offheight = self.width, self.height
-    self.mujoco_renderer = MujocoRenderer(self.model, self.data, default_cam_config=self.default_cam_config)
-    self.names = MujocoModelNames(self.model); self.target_id = self.names.site_name2id["target"]; self.set_world()
+    self.names = MujocoModelNames(self.model); self.apply_profile(); self.target_id = self.names.site_name2id["target"]
+    self.access = MujocoAccessor(self.model, self.data, self.names)
+    self.robot_idx = self.access.indices([n for n in self.names.joint_names if n.startswith("robot")]); self.set_world()
+
+  def apply_profile(self):
+    """Apply the solver, timestep and collision options of the physics profile to the loaded model"""
+    options = self.model.opt; options.timestep *= self.coarsen
+    if 'iterations' in self.profile: options.iterations = self.profile['iterations']
+    if 'tolerance' in self.profile: options.tolerance = self.profile['tolerance']
+    if self.profile.get('prune') and self.contacts is not None:
+      keep = [self.names.body_name2id[b] for b in self.contacts if b in self.names.body_name2id]
+      pruned = ~np.isin(self.model.geom_bodyid, keep); self.model.geom_contype[pruned] = self.model.geom_conaffinity[pruned] = 0
+
+  def share(self, other:'Simulation'):
+    """Rebind to the compiled model of `other` built from the same world, e.g., for batching in a `SimulationVector`
+    The current state is transferred to newly allocated data, all state mutations of the model are shared"""
+    assert (self.model_xml or self.base_xml) == (other.model_xml or other.base_xml), "Only simulations of the same world can share a model"
+    data = MujocoData(other.model); data.time = self.data.time
+    for key in ['qpos', 'qvel', 'act', 'ctrl', 'mocap_pos', 'mocap_quat']: getattr(data, key)[:] = getattr(self.data, key)
+    self.model, self.data, self.names = other.model, data, other.names; self._dirty = True
+    self.access = MujocoAccessor(self.model, self.data, self.names)
 
   def set_world(self):
     """Save current world state for reset"""
@@ -63,49 +109,66 @@ class Simulation:
     self.data.time = self.initial_time; self.data.qpos[:] = np.copy(self.initial_qpos)
     self.data.qvel[:] = np.copy(self.initial_qvel); self._forward()
   
+  @property
+  def mujoco_renderer(self) -> MujocoRenderer:
+    """Renderer created upon first use, reused across reloads of the same world at unchanged resolution and camera"""
+    key = (self.model_xml or self.base_xml, self.width, self.height, repr(self.default_cam_config))
+    if self._renderer is not None and self._render_key != key: self.close()
+    if self._renderer is None: 
+      self._renderer = MujocoRenderer(self.model, self.data, default_cam_config=self.default_cam_config); self._render_key = key
+    elif self._renderer.model is not self.model: # Rebind viewers to the reloaded model
+      for r in [self._renderer, *self._renderer._viewers.values()]: r.model, r.data = self.model, self.data
+    return self._renderer
+
+  @timing.timed('render')
   def render(self) -> Optional[np.ndarray]: 
-    return self.mujoco_renderer.render('rgb_array')
+    self.sync(); return self.mujoco_renderer.render('rgb_array')
 
-  def close(self): self.mujoco_renderer.close()
+  def close(self): 
+    """Release the renderer if created"""
+    if self._renderer is not None: self._renderer.close(); self._renderer, self._render_key = None, None
 
   @property
-  def _robot_obs(self): return robot_get_obs(self.model, self.data, self.names.joint_names)
+  def _robot_obs(self): return self.data.qpos[self.robot_idx[0]], self.data.qvel[self.robot_idx[1]]
   
   def _forward(self): 
+    """Mark the state as mutated, forwarding immediately unless `lazy`"""
+    self._dirty = True
+    if not self.lazy: self.sync()
+
+  def sync(self):
+    """Run the kinematics pass if the state was mutated since the last `mj_forward` or `mj_step`"""
+    if not self._dirty: return
     if self.model and self.model.na == 0: self.data.act[:] = None
-    mujoco_forward(self.model, self.data)
+    mujoco_forward(self.model, self.data); self._dirty = False; self.mj_calls['forward'] += 1
 
   def _get_pos(self, key): 
     """Helper to retrieve position and velocity"""
-    return (get_site_xpos(self.model, self.data, key).copy().ravel(),
-      (get_site_xvelp(self.model, self.data, key) * self.dt).ravel()) 
+    self.sync(); return self.access.site_xpos(key).copy(), self.access.site_velocity(key)[0] * self.dt
   
   def _get_rot(self, key): 
     """Helper to retrieve rotation and velocity"""
-    return (mat2euler(get_site_xmat(self.model, self.data, key)).copy().ravel(),
-      (get_site_xvelr(self.model, self.data, key) * self.dt).ravel())
+    self.sync(); return mat2euler(self.access.site_xmat(key)), self.access.site_velocity(key)[1] * self.dt
 
   def _set_vel(self, qvel): 
-    [set_joint_qvel(self.model, self.data, name, value) for name, value in qvel.items()]
+    [self.access.set_qvel(name, value) for name, value in qvel.items()]
     self._forward()
 
   def _set_pos(self, qpos): 
-    [set_joint_qpos(self.model, self.data, name, value) for name, value in qpos.items()]; 
-    reset_mocap_welds(self.model, self.data); self._forward()
+    [self.access.set_qpos(name, value) for name, value in qpos.items()]; 
+    self.access.reset_mocap_welds(); self._forward()
 
-  def _set_mocap(self, pos, rot, key): 
-    set_mocap_pos(self.model, self.data, key, pos)
-    set_mocap_quat(self.model, self.data, key, rot)
+  def _set_mocap(self, pos, rot, key): self.access.set_mocap(key, pos, rot)
     
   def do_simulation(self, action:Optional[np.ndarray]=None):
     """Step the simulation applying a `ctrl` action `self.frame_skip`-times"""
     # Check control input is contained in the action space
     assert self.data is not None, "No model loaded"
     if action is not None: 
-      ctrl_set_action(self.model, self.data, action) # Apply control action
-      mocap_set_action(self.model, self.data, action) # Apply mocap control
-    mujoco_step(self.model, self.data, nstep=self.frame_skip)
-    mujocoPostConstraint(self.model, self.data)
+      self.access.ctrl_set_action(action) # Apply control action
+      if self.model.nmocap: self.sync(); self.access.mocap_set_action(action) # Apply mocap control relative to current poses
+    mujoco_step(self.model, self.data, nstep=self.frame_skip); self._dirty = False; self.mj_calls['step'] += 1
+    if self.post_constraint or not self.lazy: mujocoPostConstraint(self.model, self.data); self.mj_calls['post_constraint'] += 1
 
   def _pos(self, idx: Union[np.ndarray, tuple]) -> np.ndarray:
     """Converts a cell index `(i,j)` to x and y position in the MuJoCo simulation"""
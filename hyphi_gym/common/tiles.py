@@ -0,0 +1,71 @@
+""" Dependency-light renderer composing RGB frames of board-based envs from a cached atlas of per-cell sprites (numpy only)
+Usage: `render(env.board, (64,64))` for a single board or `render(boards, (720,720), headings)` for a `(N, H, W)` batch,
+`update(frame, board, cells)` redraws changed cells of a composed frame in place"""
+import functools; from typing import Optional, Union; import numpy as np
+from hyphi_gym.common.board import *
+
+COLORS = {WALL: (62, 64, 76), FIELD: (228, 228, 222), AGENT: (40, 96, 200), TARGET: (48, 168, 72), HOLE: (24, 24, 28)}
+HEADING = len(CHARS) # Atlas index of the agent heading `UP`, followed by the remaining `ACTIONS`
+
+@functools.lru_cache(maxsize=16)
+def atlas(tile:int) -> np.ndarray:
+  """Sprites of all `CHARS` followed by the agent heading towards each of the `ACTIONS` as `(K * tile * tile, 3)` uint8 pixels
+  The agent sprite of `CELLS[AGENT]` heads `RIGHT`, as the agent does upon reset"""
+  v, u = (np.mgrid[:tile, :tile] + .5) / tile; edge = max(tile // 16, 1) / tile
+  def sprite(color, mask=None, base=FIELD):
+    s = np.empty((tile, tile, 3), dtype=np.uint8); s[:] = COLORS[base]
+    if base == FIELD: s[(u < edge) | (v < edge)] = np.subtract(COLORS[FIELD], 24) # Grid lines
+    if base == WALL: s[(u < 2*edge) | (v < 2*edge)] = np.add(COLORS[WALL], 20)     # Bevel
+    if mask is not None: s[mask] = color
+    return s
+  disc = lambda r: (u - .5)**2 + (v - .5)**2 <= r**2
+  up = (v >= .2) & (v <= .8) & (np.abs(u - .5) <= (v - .2) / 2)
+  heading = [sprite(COLORS[AGENT], np.rot90(up, k=-a)) for a in ACTIONS] # Rotate clockwise
+  sprites = {WALL: sprite(None, base=WALL), FIELD: sprite(None), AGENT: heading[RIGHT],
+    TARGET: sprite(COLORS[TARGET], disc(.3)), HOLE: sprite(COLORS[HOLE], (u > .12) & (u < .88) & (v > .12) & (v < .88))}
+  pixels = np.stack([sprites[c] for c in CHARS] + heading).reshape(-1, 3); pixels.flags.writeable = False; return pixels
+
+@functools.lru_cache(maxsize=16)
+def index(size:tuple[int,int], resolution:tuple[int,int]) -> tuple[int, np.ndarray, np.ndarray, np.ndarray]:
+  """Tile size, output row and column cells and sprite pixel offsets nearest-sampling boards of `size` at `resolution`"""
+  (H, W), (h, w) = size, resolution; tile = max(-(-h // H), -(-w // W), 1)
+  rows, cols = np.arange(h) * H, np.arange(w) * W; r, c = rows // h, cols // w
+  offset = ((rows % h) * tile // h)[:, None] * tile + ((cols % w) * tile // w)[None, :]
+  return tile, r, c, offset.astype(np.int32)
+
+def render(boards:np.ndarray, resolution:tuple[int,int]=(720,720), heading:Optional[Union[int,np.ndarray]]=None) -> np.ndarray:
+  """Compose `(h, w, 3)` frames of a `(H, W)` board or `(N, h, w, 3)` frames of an `(N, H, W)` batch at `resolution` (h, w)
+  The agent is drawn heading towards the last action `heading` (per board) if provided"""
+  boards = np.asarray(boards); batch = boards.ndim == 3; boards = boards if batch else boards[None]
+  tile, r, c, offset = index(boards.shape[1:], tuple(resolution))
+  if heading is not None: boards = np.where(boards == CELLS[AGENT], HEADING + np.reshape(heading, (-1, 1, 1)), boards)
+  cells = np.take(np.take((boards * (tile * tile)).astype(np.int32), r, axis=1), c, axis=2) # Separable nearest sampling
+  frames = np.take(atlas(tile), cells + offset, axis=0)
+  return frames if batch else frames[0]
+
+@functools.lru_cache(maxsize=16)
+def layers(size:tuple[int,int], resolution:tuple[int,int]) -> tuple[np.ndarray, list[list[tuple]]]:
+  """Frames of boards of `size` filled with each sprite of the atlas and the output area of each cell, from which `update` copies"""
+  _, r, c, _ = index(size, resolution); sprites = len(CHARS) + len(ACTIONS)
+  rows, cols = np.searchsorted(r, np.arange(size[0] + 1)), np.searchsorted(c, np.arange(size[1] + 1))
+  frames = render(np.broadcast_to(np.arange(sprites)[:, None, None], (sprites, *size)), resolution); frames.flags.writeable = False
+  return frames, [[(slice(rows[i], rows[i+1]), slice(cols[j], cols[j+1])) for j in range(size[1])] for i in range(size[0])]
+
+def update(frame:np.ndarray, board:np.ndarray, cells:list[tuple[int,int]], heading:Optional[int]=None):
+  """Redraw the `cells` of `board` in its `frame` composed by `render` in place"""
+  frames, areas = layers(board.shape, frame.shape[:2])
+  for i, j in cells:
+    cell = HEADING + heading if heading is not None and board[i, j] == CELLS[AGENT] else board[i, j]
+    area = areas[i][j]; frame[area] = frames[cell][area]
+
+class Tiles:
+  """Grid renderer drawing the `board` of `env` via `render` at its `metadata['render_resolution']`"""
+  def __init__(self, env): self.env, self.heading = env, RIGHT
+
+  def reset_world(self): self.heading = RIGHT
+
+  def update_world(self, action, mPos, Cell): self.heading = action
+
+  def render(self) -> np.ndarray: return render(self.env.board, self.env.metadata['render_resolution'], self.heading)
+
+  def close(self): pass
@@ -0,0 +1,162 @@
+import gymnasium as gym; import numpy as np
+from typing import Optional, Union; from gymnasium.vector.utils import batch_space
+from hyphi_gym.common.base import GOAL, STEP, FAIL
+from hyphi_gym.common.board import *
+from hyphi_gym.common.tiles import render
+
+MOVES = np.array([(-1,0),(0,1),(1,0),(0,-1)]) # Position deltas of [UP, RIGHT, DOWN, LEFT]
+
+class GridVector(gym.vector.VectorEnv):
+  """Natively batched grid core stepping `num_envs` boards held as one `(N, H, W)` array
+  • Actions, rewards, terminations and truncations are computed in vectorized form following `Base.step`
+  • Layout generation and randomization upon (auto-)reset is delegated to one grid env per board
+  • Autoreset follows the same-step convention of `SyncVectorEnv` (`final_observation` and `final_info` in infos)
+  • Rendering (`rgb_array`) composes the frames of all boards at once via `tiles.render`
+  Set `env` to the grid env to batch, e.g., `GridMaze`, and pass its configuration via `kwargs`"""
+
+  env: type; metadata = {"render_modes": ["rgb_array"], "render_fps": 5, "render_resolution": (720,720),
+    "autoreset_mode": getattr(getattr(gym.vector, 'AutoresetMode', None), 'SAME_STEP', None)}
+
+  def __init__(self, num_envs:int=1, max_episode_steps:Optional[int]=None, seed:Optional[int]=None, render_mode:Optional[str]=None, **kwargs):
+    assert render_mode in [None, *self.metadata['render_modes']], f"Batched grids only support {self.metadata['render_modes']} rendering"
+    seeds = [None if seed is None else seed + i for i in range(num_envs)]
+    self.envs = [self.env(**kwargs, seed=s) for s in seeds]; env = self.envs[0]
+    if max_episode_steps is not None: [setattr(e, 'max_episode_steps', max_episode_steps) for e in self.envs]
+    self.sparse, self.detailed, self.explore = env.sparse, env.detailed, env.explore
+    self.num_envs, self.max_episode_steps, self.render_mode, self.closed, self.viewer = num_envs, env.max_episode_steps, render_mode, False, None
+    self.single_observation_space, self.single_action_space = env.observation_space, env.action_space
+    self.observation_space = batch_space(self.single_observation_space, n=num_envs)
+    self.action_space = batch_space(self.single_action_space, n=num_envs); self.action_space.seed(seed)
+    self.boards = np.zeros((num_envs, *env.size), dtype=int); self._index = np.arange(num_envs)
+    self.apos, self.tpos = np.zeros((num_envs, 2), dtype=int), np.zeros((num_envs, 2), dtype=int)
+    self.steps, self.returns, self.headings = np.zeros(num_envs, dtype=int), np.zeros(num_envs), np.full(num_envs, RIGHT)
+    self.obs_resolution = env.pixels.shape[:2] if env.obs_mode == 'pixels' else None
+
+  @property
+  def name(self) -> str: return self.envs[0].name
+
+  @property
+  def reward_threshold(self) -> list: return [e.reward_threshold for e in self.envs]
+
+  def _reset(self, i:int, seed:Optional[int]=None):
+    """Reset board `i` via its grid env, copying the resulting board and positions"""
+    self.envs[i].reset(seed=seed); self.boards[i] = self.envs[i].board
+    self.apos[i], self.tpos[i] = self.envs[i].getpos(self.boards[i]), self.envs[i].getpos(self.boards[i], TARGET)
+    self.steps[i], self.returns[i], self.headings[i] = 0, 0, RIGHT
+
+  def _observe(self, boards:np.ndarray) -> np.ndarray:
+    """Observations of `boards`, either flattened or composed as pixels at `obs_resolution`"""
+    return boards.reshape(len(boards), -1).copy() if self.obs_resolution is None else render(boards, self.obs_resolution)
+
+  def reset(self, seed:Optional[Union[int, list]]=None, options:Optional[dict]=None) -> tuple[np.ndarray, dict]:
+    """Reset all boards, seeding board `i` with `seed+i` or `seed[i]` if provided"""
+    seeds = seed if isinstance(seed, (list, tuple)) else [None if seed is None else seed + i for i in range(self.num_envs)]
+    [self._reset(i, s) for i, s in enumerate(seeds)]
+    return self._observe(self.boards), {}
+
+  def step(self, actions:np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict]:
+    """Step all boards executing `actions`, auto-resetting finished episodes"""
+    idx, position = self._index, self.apos; target = position + MOVES[np.asarray(actions)]
+    field = self.boards[idx, target[:,0], target[:,1]]; distance = np.linalg.norm(position - self.tpos, axis=1)
+    goal, fail = field == CELLS[TARGET], field == CELLS[HOLE]; terminated = goal | fail
+
+    # Move Agents and update boards
+    revert = np.where((position == self.tpos).all(axis=1), CELLS[TARGET], CELLS[FIELD])
+    moved = field != CELLS[WALL]; placed = (field == CELLS[FIELD]) | goal
+    self.boards[idx[moved], position[moved,0], position[moved,1]] = revert[moved]
+    self.boards[idx[placed], target[placed,0], target[placed,1]] = CELLS[AGENT]; self.apos[placed] = target[placed]
+    self.headings[:] = actions
+
+    # Calculate the rewards
+    if self.explore: reward = np.zeros(self.num_envs); terminated = np.zeros_like(terminated)
+    elif self.detailed: reward = np.exp(-distance)
+    else: reward = STEP + self.max_episode_steps * (goal * GOAL + fail * FAIL)
+    self.steps += 1; self.returns += reward; truncated = self.steps >= self.max_episode_steps
+    reason = np.where(goal, 'GOAL', np.where(fail, 'FAIL', np.where(truncated, 'TIME', None))).astype(object)
+    if self.sparse: reward = np.where(terminated | truncated, self.returns, 0)
+    infos = {'distance': distance, '_distance': np.ones(self.num_envs, dtype=bool),
+             'termination_reason': reason, '_termination_reason': reason != None}
+
+    # Autoreset finished boards
+    observation = self._observe(self.boards)
+    if (done := terminated | truncated).any():
+      final, final_info = np.full(self.num_envs, None, dtype=object), np.full(self.num_envs, None, dtype=object)
+      for i in idx[done]:
+        final[i], final_info[i] = observation[i].copy(), {'distance': distance[i], 'termination_reason': reason[i]}
+        self._reset(i); observation[i] = self._observe(self.boards[i:i+1])[0]
+      infos = {**infos, 'final_observation': final, '_final_observation': done, 'final_info': final_info, '_final_info': done}
+    return observation, reward, terminated, truncated, infos
+
+  def render(self) -> Optional[np.ndarray]:
+    """Return the `(N, h, w, 3)` frames of all boards if `render_mode` is set"""
+    if self.render_mode is None: return None
+    return render(self.boards, self.metadata['render_resolution'], self.headings)
+
+  def close_extras(self, **kwargs): self.envs.clear()
+
+class SimulationVector(gym.vector.VectorEnv):
+  """Thread-pool batched MuJoCo core stepping `num_envs` simulations of one fixed world sharing a single compiled `MjModel`
+  • Every simulation keeps its own `MjData`, stepped via `Base.step` in chunks on `threads` workers (`mj_step` releases the GIL)
+  • Observations are written into a shared `(N, obs_dim)` buffer, returned as copy unless `copy=False`
+  • Autoreset follows the same-step convention of `SyncVectorEnv` (`final_observation` and `final_info` in infos)
+  • Model mutations (e.g., target sites) are shared, thus layouts can not be randomized
+  Set `env` to the simulation env to batch, e.g., `PointMaze`, and pass its configuration via `kwargs`"""
+
+  env: type; metadata = GridVector.metadata
+
+  def __init__(self, num_envs:int=1, max_episode_steps:Optional[int]=None, seed:Optional[int]=None, 
+               threads:Optional[int]=None, copy:bool=True, **kwargs):
+    assert kwargs.get('render_mode') is None, "Rendering is not supported for batched simulations"
+    assert 'Layouts' not in kwargs.get('random', []), "Batched simulations share one fixed layout"
+    from concurrent.futures import ThreadPoolExecutor; from os import cpu_count
+    self.envs = [] # Share the model of the first simulation, releasing the others right away
+    for s in [None if seed is None else seed + i for i in range(num_envs)]:
+      self.envs.append(env := self.env(**kwargs, seed=s))
+      if len(self.envs) > 1: env.share(self.envs[0])
+    if max_episode_steps is not None: [setattr(e, 'max_episode_steps', max_episode_steps) for e in self.envs]
+    env = self.envs[0]; self.model, self.copy = env.model, copy
+    self.num_envs, self.max_episode_steps, self.render_mode, self.closed, self.viewer = num_envs, env.max_episode_steps, None, False, None
+    self.single_observation_space, self.single_action_space = env.observation_space, env.action_space
+    self.observation_space = batch_space(self.single_observation_space, n=num_envs)
+    self.action_space = batch_space(self.single_action_space, n=num_envs); self.action_space.seed(seed)
+    self.observations = np.zeros((num_envs, *env.observation_space.shape), dtype=env.observation_space.dtype)
+    self.rewards, self.terminations, self.truncations = np.zeros(num_envs), np.zeros(num_envs, dtype=bool), np.zeros(num_envs, dtype=bool)
+    self.infos = [{} for _ in range(num_envs)]
+    self.chunks = np.array_split(np.arange(num_envs), min(threads or cpu_count() or 1, num_envs))
+    self.pool = ThreadPoolExecutor(max_workers=len(self.chunks))
+
+  @property
+  def name(self) -> str: return self.envs[0].name
+
+  @property
+  def reward_threshold(self) -> list: return [e.reward_threshold for e in self.envs]
+
+  def _run(self, task, *args):
+    """Run `task(i, *args)` for all envs in chunks on the thread pool, returning the observations and aggregated infos"""
+    chunk = lambda idx: [task(i, *args) for i in idx]
+    [f.result() for f in [self.pool.submit(chunk, idx) for idx in self.chunks]]
+    infos = {}
+    for i, info in enumerate(self.infos): infos = self._add_info(infos, info, i)
+    return self.observations.copy() if self.copy else self.observations, infos
+
+  def _reset(self, i:int, seeds:list):
+    self.observations[i], self.infos[i] = self.envs[i].reset(seed=seeds[i])
+
+  def _step(self, i:int, actions:np.ndarray):
+    observation, self.rewards[i], self.terminations[i], self.truncations[i], info = self.envs[i].step(actions[i])
+    if self.terminations[i] or self.truncations[i]:
+      final_observation, final_info = observation, info; observation, info = self.envs[i].reset()
+      info = {**info, 'final_observation': final_observation, 'final_info': final_info}
+    self.observations[i], self.infos[i] = observation, info
+
+  def reset(self, seed:Optional[Union[int, list]]=None, options:Optional[dict]=None) -> tuple[np.ndarray, dict]:
+    """Reset all simulations, seeding simulation `i` with `seed+i` or `seed[i]` if provided"""
+    seeds = seed if isinstance(seed, (list, tuple)) else [None if seed is None else seed + i for i in range(self.num_envs)]
+    return self._run(self._reset, seeds)
+
+  def step(self, actions:np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict]:
+    """Step all simulations executing `actions`, auto-resetting finished episodes"""
+    observations, infos = self._run(self._step, np.asarray(actions))
+    return observations, self.rewards.copy(), self.terminations.copy(), self.truncations.copy(), infos
+
+  def close_extras(self, **kwargs): self.pool.shutdown(); [e.close() for e in self.envs]; self.envs.clear()
@@ -1,5 +1,6 @@
 from hyphi_gym.common.robot import Robot
 from hyphi_gym.common.simulation import get_xml
+from hyphi_gym.common.vector import SimulationVector
 TASKS = ['Reach']
 
 class Fetch(Robot):
@@ -10,3 +11,5 @@ class Fetch(Robot):
     self._name = f'Fetch{task}' 
     if len(kwargs['random']): kwargs = {**kwargs, 'continue_task': False}
     Robot.__init__(self, render_mode=render_mode, **kwargs)
+
+class FetchVector(SimulationVector): env = Fetch
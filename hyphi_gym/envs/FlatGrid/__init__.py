@@ -1,8 +1,11 @@
 from hyphi_gym.common.grid import Grid
+from hyphi_gym.common.vector import GridVector
 from hyphi_gym.common.board import Board
 
 class FlatGrid(Grid, Board):
-  def __init__(self, size, random=[], render_mode=None, **kwargs):
+  def __init__(self, size, random=[], render_mode=None, obs_mode='board', obs_resolution=(64,64), **kwargs):
     self._name = f'FlatGrid{size}' 
     Board.__init__(self, size=(size,size), layout=None, random=random, max_episode_steps=100, **kwargs)
-    Grid.__init__(self, render_mode=render_mode)
+    Grid.__init__(self, render_mode=render_mode, obs_mode=obs_mode, obs_resolution=obs_resolution)
+
+class FlatGridVector(GridVector): env = FlatGrid
@@ -1,7 +1,10 @@
 from hyphi_gym.common.grid import Grid
+from hyphi_gym.common.vector import GridVector
 from hyphi_gym.common.maze import Maze
 
 class GridMaze(Maze,Grid):
-  def __init__(self, render_mode=None, **kwargs):
+  def __init__(self, render_mode=None, obs_mode='board', obs_resolution=(64,64), **kwargs):
     Maze.__init__(self, **kwargs)
-    Grid.__init__(self, render_mode=render_mode)
+    Grid.__init__(self, render_mode=render_mode, obs_mode=obs_mode, obs_resolution=obs_resolution)
+
+class GridMazeVector(GridVector): env = GridMaze
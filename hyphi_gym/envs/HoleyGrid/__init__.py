@@ -1,7 +1,10 @@
 from hyphi_gym.common.grid import Grid
+from hyphi_gym.common.vector import GridVector
 from hyphi_gym.common.holes import Holes
 
 class HoleyGrid(Holes, Grid):
-  def __init__(self, level='Train', render_mode=None, **kwargs):
+  def __init__(self, level='Train', render_mode=None, obs_mode='board', obs_resolution=(64,64), **kwargs):
     Holes.__init__(self, level, max_episode_steps=100, **kwargs)
-    Grid.__init__(self, render_mode=render_mode)
+    Grid.__init__(self, render_mode=render_mode, obs_mode=obs_mode, obs_resolution=obs_resolution)
+
+class HoleyGridVector(GridVector): env = HoleyGrid
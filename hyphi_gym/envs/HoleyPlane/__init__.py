@@ -1,7 +1,13 @@
+from gymnasium import spaces; import numpy as np
 from hyphi_gym.common.holes import Holes
 from hyphi_gym.common.point import Point
+from hyphi_gym.common.vector import SimulationVector
 
 class HoleyPlane(Point, Holes):
-  def __init__(self, render_mode=None, **kwargs):
+  def __init__(self, render_mode=None, physics='default', bucket_holes=None, **kwargs):
     Holes.__init__(self, max_episode_steps=400, **kwargs)
-    Point.__init__(self, render_mode=render_mode)
+    Point.__init__(self, render_mode=render_mode, physics=physics, bucket_holes=bucket_holes)
+    # Generated layouts place their holes upon reset, observe the nearest hole regardless
+    self.observation_space = spaces.Box(-np.inf, np.inf, shape=(8,), dtype=np.float64)
+
+class HoleyPlaneVector(SimulationVector): env = HoleyPlane
@@ -1,7 +1,10 @@
 from hyphi_gym.common.maze import Maze
 from hyphi_gym.common.point import Point
+from hyphi_gym.common.vector import SimulationVector
 
 class PointMaze(Point, Maze): # Point(Mujoco) | Maze(Board(Base))
-  def __init__(self, render_mode=None, **kwargs):
+  def __init__(self, render_mode=None, physics='default', **kwargs):
     Maze.__init__(self, prefix='Point', **kwargs)
-    Point.__init__(self, render_mode=render_mode)
+    Point.__init__(self, render_mode=render_mode, physics=physics)
+
+class PointMazeVector(SimulationVector): env = PointMaze
@@ -0,0 +1,46 @@
+""" Memory-mapped corpus of pre-generated layouts for the `Layouts` variants (e.g., `Mazes9`, `PointMazes9`, `HoleyGrids9`, `HoleyPlanes9`)
+Entries are stored as structured `.npy` file holding the `seed`, the uint8 `layout`, its optimal `path` length and `threshold`
+Usage: `python -m hyphi_gym.utils.corpus Mazes9 --seeds 0 10000 --out Mazes9.npy`, then `gym.make(**named('Mazes9'), corpus='Mazes9.npy')`"""
+import argparse; import numpy as np; from typing import Optional
+
+def dtype(size:tuple[int,int]) -> np.dtype:
+  return np.dtype([('seed', np.int64), ('layout', np.uint8, tuple(size)), ('path', np.uint16), ('threshold', np.float64)])
+
+class Corpus:
+  """Read-only memory-mapped layout corpus covering a contiguous range of seeds"""
+  def __init__(self, path:str):
+    self.path, self.data = path, np.load(path, mmap_mode='r'); assert len(self.data), f"Empty corpus {path}"
+    self.start = int(self.data['seed'][0]); self.stop = self.start + len(self.data)
+    self.size = self.data.dtype['layout'].shape
+
+  def __len__(self) -> int: return len(self.data)
+
+  def __contains__(self, seed:Optional[int]) -> bool: return seed is not None and self.start <= seed < self.stop
+
+  def __getitem__(self, seed:int) -> np.ndarray:
+    """Return the layout generated for `seed`"""
+    return self.entry(seed)[0]
+
+  def entry(self, seed:int) -> tuple[np.ndarray, int, float]:
+    """Return the layout generated for `seed` with its stored optimal path length and reward threshold"""
+    assert seed in self, f"Seed {seed} not in corpus [{self.start},{self.stop})"
+    entry = self.data[seed - self.start]; return entry['layout'].astype(int), int(entry['path']), float(entry['threshold'])
+
+def generate(name:str, seeds:range, path:str) -> Corpus:
+  """Generate the layouts of `seeds` for the env `name` writing them to `path`"""
+  import gymnasium as gym; from hyphi_gym import named, register_envs; register_envs()
+  env = gym.make(**named(name)).unwrapped; assert 'Layouts' in env.random, f"{name} does not generate layouts"
+  corpus = np.lib.format.open_memmap(path, mode='w+', dtype=dtype(env.size), shape=(len(seeds),))
+  for i, seed in enumerate(seeds):
+    env.seed(seed); layout = env._generate()
+    corpus[i] = (seed, layout, env._validate(layout, error=False), env._reward_threshold(layout))
+  corpus.flush(); del corpus; return Corpus(path)
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('name', help='Layout-randomized environment name, e.g., Mazes9 or HoleyGrids11')
+  parser.add_argument('--seeds', nargs=2, type=int, default=[0, 1000], help='Seed range [start, stop) to generate')
+  parser.add_argument('--out', default=None, help='Corpus file (defaults to <name>.npy)')
+  args = parser.parse_args(); path = args.out or f'{args.name}.npy'
+  corpus = generate(args.name, range(*args.seeds), path)
+  print(f"Generated {len(corpus)} layouts of {args.name} to {path}")
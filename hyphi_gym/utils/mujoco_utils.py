@@ -374,3 +374,72 @@ class MujocoModelNames:
 
   @property
   def sensor_id2name(self): return self._sensor_id2name
+
+
+QPOS_DIM = {MujocoJoint.mjJNT_FREE: 7, MujocoJoint.mjJNT_BALL: 4, MujocoJoint.mjJNT_SLIDE: 1, MujocoJoint.mjJNT_HINGE: 1}
+QVEL_DIM = {MujocoJoint.mjJNT_FREE: 6, MujocoJoint.mjJNT_BALL: 3, MujocoJoint.mjJNT_SLIDE: 1, MujocoJoint.mjJNT_HINGE: 1}
+
+class MujocoAccessor:
+  """Index-based access to the MuJoCo hot path, compiled once per loaded model and data from `MujocoModelNames`
+  • Joint names resolve to `qpos` and `qvel` slices, site and mocap body names to their ids
+  • Getters return views into `data`, setters write in place
+  • Site velocities are computed from site Jacobians (`mj_jacSite`) into preallocated buffers times the current `qvel`
+  • Actuator biases and mocap welds are resolved for applying control actions"""
+
+  def __init__(self, model:MujocoModel, data:MujocoData, names:MujocoModelNames):
+    self.model, self.data = model, data; types = model.jnt_type
+    self.qpos = {n: slice(a:=model.jnt_qposadr[i], a + QPOS_DIM[types[i]]) for n, i in names.joint_name2id.items()}
+    self.qvel = {n: slice(a:=model.jnt_dofadr[i], a + QVEL_DIM[types[i]]) for n, i in names.joint_name2id.items()}
+    self.site = names.site_name2id; self.mocap = {n: model.body_mocapid[i] for n, i in names.body_name2id.items() if model.body_mocapid[i] >= 0}
+    self.biased = np.flatnonzero(model.actuator_biastype[:model.nu] != 0); self.biased_qpos = model.jnt_qposadr[model.actuator_trnid[self.biased, 0]]
+    welds = [(o1, o2) for t, o1, o2 in zip(model.eq_type, model.eq_obj1id, model.eq_obj2id) if t == MujocoEq.mjEQ_WELD]
+    self.welds = np.array([(model.body_mocapid[o1], o2) if model.body_mocapid[o1] != -1 else (model.body_mocapid[o2], o1) for o1, o2 in welds], dtype=int).reshape(-1, 2)
+    self.weld_eqs = np.flatnonzero(model.eq_type == MujocoEq.mjEQ_WELD); self._jacp, self._jacr = np.zeros((3, model.nv)), np.zeros((3, model.nv))
+    assert (self.welds[:,0] != -1).all(), "Welds are expected to attach mocap bodies"
+
+  def indices(self, joints:list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Return `qpos` and `qvel` indices of all `joints`"""
+    idx = lambda slices: np.concatenate([np.arange(s.start, s.stop) for s in slices]).astype(int) if len(joints) else np.zeros(0, dtype=int)
+    return idx([self.qpos[j] for j in joints]), idx([self.qvel[j] for j in joints])
+
+  def get_qpos(self, joint:str) -> np.ndarray: return self.data.qpos[self.qpos[joint]]
+
+  def get_qvel(self, joint:str) -> np.ndarray: return self.data.qvel[self.qvel[joint]]
+
+  def set_qpos(self, joint:str, value): self.data.qpos[self.qpos[joint]] = value
+
+  def set_qvel(self, joint:str, value): self.data.qvel[self.qvel[joint]] = value
+
+  def site_xpos(self, site:str) -> np.ndarray: return self.data.site_xpos[self.site[site]]
+
+  def site_xmat(self, site:str) -> np.ndarray: return self.data.site_xmat[self.site[site]].reshape(3, 3)
+
+  def site_velocity(self, site:str) -> tuple[np.ndarray, np.ndarray]:
+    """Return the linear and rotational world-frame velocity of `site` as `J(q)·qvel`, matching `get_site_xvelp` and `get_site_xvelr`
+    (`mj_objectVelocity` would read `cvel` from the start of the last step instead of the stepped `qvel`)"""
+    mujoco_jacSite(self.model, self.data, self._jacp, self._jacr, self.site[site])
+    return self._jacp @ self.data.qvel, self._jacr @ self.data.qvel
+
+  def set_mocap(self, body:str, pos=None, quat=None):
+    if pos is not None: self.data.mocap_pos[self.mocap[body]] = pos
+    if quat is not None: self.data.mocap_quat[self.mocap[body]] = quat
+
+  def ctrl_set_action(self, action:np.ndarray):
+    """Copy the actuator part of `action` into ctrl, relative to the current qpos for biased (position) actuators"""
+    if self.model.nu == 0: return
+    action = action[self.model.nmocap * 7:]; self.data.ctrl[:len(action)] = action
+    self.data.ctrl[self.biased] = self.data.qpos[self.biased_qpos] + action[self.biased]
+
+  def mocap_set_action(self, action:np.ndarray):
+    """Move the mocap bodies by the position and orientation deltas in `action` relative to their welded bodies"""
+    if self.model.nmocap == 0: return
+    action = action[:self.model.nmocap * 7].reshape(self.model.nmocap, 7); self.reset_mocap2body_xpos()
+    self.data.mocap_pos[:] = self.data.mocap_pos + action[:, :3]; self.data.mocap_quat[:] = self.data.mocap_quat + action[:, 3:]
+
+  def reset_mocap2body_xpos(self):
+    """Reset the mocap bodies to the pose of the bodies they are welded to"""
+    mocap, body = self.welds.T; self.data.mocap_pos[mocap] = self.data.xpos[body]; self.data.mocap_quat[mocap] = self.data.xquat[body]
+
+  def reset_mocap_welds(self):
+    """Reset the mocap weld offsets used for actuation"""
+    if self.model.nmocap > 0: self.model.eq_data[self.weld_eqs, :7] = np.array([0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0])
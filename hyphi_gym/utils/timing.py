@@ -0,0 +1,76 @@
+""" Lightweight per-phase latency instrumentation of the envs (e.g., `step`, `execute`, `reward`, `randomize`, `validate`), disabled by default
+Each phase records its calls, total wall time and a log2 histogram of durations (bin `b` counts calls taking less than 2^b µs)
+Usage: `timing.enable(dump='timings.jsonl', interval=60)` (or `HYPHI_TIMING=1`), then `timing.summary()` or `Monitor.timings()`"""
+import functools; import json; import os; import threading; import time; from typing import Optional
+
+ENABLED = os.environ.get('HYPHI_TIMING', '0') not in ('', '0')
+BINS = 24 # Up to 2^23µs (~8s), longer calls are counted in the last bin
+PHASES: dict[str, list] = {} # Phase name -> [calls, total ns, histogram]
+_lock = threading.Lock(); _dump = {'path': None, 'interval': 60e9, 'last': time.perf_counter_ns()}
+
+def enable(enabled:bool=True, dump:Optional[str]=None, interval:float=60.0):
+  """Switch the instrumentation, optionally appending the summary to the json lines file `dump` every `interval` seconds"""
+  global ENABLED; ENABLED = enabled; _dump.update(path=dump, interval=interval * 1e9, last=time.perf_counter_ns())
+
+def reset():
+  with _lock: PHASES.clear()
+
+def record(name:str, start:int):
+  """Record the duration of phase `name` started at `start` (ns), dumping the summary if due"""
+  end = time.perf_counter_ns(); duration = end - start
+  with _lock:
+    if (phase := PHASES.get(name)) is None: phase = PHASES[name] = [0, 0, [0] * BINS]
+    phase[0] += 1; phase[1] += duration; phase[2][min((duration // 1000).bit_length(), BINS - 1)] += 1
+  if _dump['path'] is not None and end - _dump['last'] >= _dump['interval']: _dump['last'] = end; dump()
+
+class _Phase:
+  __slots__ = ['name', 'start']
+  def __init__(self, name:str): self.name = name
+  def __enter__(self): self.start = time.perf_counter_ns()
+  def __exit__(self, *exc): record(self.name, self.start)
+
+class _Disabled:
+  def __enter__(self): pass
+  def __exit__(self, *exc): pass
+DISABLED = _Disabled()
+
+def phase(name:str):
+  """Context measuring the enclosed block as phase `name`"""
+  return _Phase(name) if ENABLED else DISABLED
+
+def timed(name:str):
+  """Decorator measuring calls of the decorated function as phase `name`"""
+  def decorate(function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+      if not ENABLED: return function(*args, **kwargs)
+      start = time.perf_counter_ns()
+      try: return function(*args, **kwargs)
+      finally: record(name, start)
+    return wrapper
+  return decorate
+
+def snapshot() -> dict[str, tuple[int,int]]:
+  """Current calls and total ns per phase, e.g., to summarize an interval via `summary(since=...)`"""
+  with _lock: return {name: (calls, total) for name, (calls, total, _) in PHASES.items()}
+
+def quantile(histogram:list, q:float) -> float:
+  """Upper bound (µs) of the histogram bin holding quantile `q`"""
+  bound = q * sum(histogram); count = 0
+  for b, n in enumerate(histogram):
+    count += n
+    if n and count >= bound: return float(2**b)
+  return 0.0
+
+def summary(since:Optional[dict]=None) -> dict[str, dict]:
+  """Calls, total ms, mean µs and p50/p99 bounds per phase, only calls and total ms since the `snapshot` `since` if provided"""
+  with _lock: phases = {name: (calls, total, list(histogram)) for name, (calls, total, histogram) in PHASES.items()}
+  if since is not None: return {name: {'calls': calls - since.get(name, (0,0))[0], 'ms': round((total - since.get(name, (0,0))[1]) / 1e6, 3)}
+    for name, (calls, total, _) in phases.items() if calls > since.get(name, (0,0))[0]}
+  return {name: {'calls': calls, 'ms': round(total / 1e6, 3), 'mean_us': round(total / calls / 1e3, 3),
+    'p50_us': quantile(histogram, .5), 'p99_us': quantile(histogram, .99), 'histogram': histogram} for name, (calls, total, histogram) in phases.items()}
+
+def dump(path:Optional[str]=None):
+  """Append the timestamped summary to the json lines file `path` (defaults to the periodic dump file)"""
+  path = path or _dump['path']; assert path is not None, "Please provide a dump file"
+  with open(path, 'a') as f: f.write(json.dumps({'time': time.time(), 'pid': os.getpid(), 'phases': summary()}) + '\n')
@@ -0,0 +1,26 @@
+""" Streaming video encoding, piping frames to an ffmpeg process as they arrive (via `imageio_ffmpeg`, installed along moviepy)
+Usage: `stream = VideoStream('eval.mp4', fps=25); stream.write(env.render()); stream.close()`"""
+from os import path as osp; from typing import Optional; import numpy as np
+
+class VideoStream:
+  """Encoder writing RGB(A) frames (arrays or images) to `path` at `fps` without holding them in memory
+  The encoder is started upon the first frame, every further start after `close()` writes a new chunk (e.g., `eval-1.mp4`)"""
+  def __init__(self, path:str, fps:float):
+    self.path, self.fps, self.chunks, self.frames, self.writer = path, fps, [], 0, None
+
+  def write(self, frame):
+    """Encode `frame`, starting a new chunk if required"""
+    frame = np.asarray(frame)[..., :3]
+    if self.writer is None: self._start(frame.shape)
+    self.writer.send(np.ascontiguousarray(frame, dtype=np.uint8)); self.frames += 1 # type: ignore
+
+  def _start(self, shape:tuple):
+    import imageio_ffmpeg; root, ext = osp.splitext(self.path)
+    self.chunks.append(self.path if not len(self.chunks) else f'{root}-{len(self.chunks)}{ext}')
+    self.writer = imageio_ffmpeg.write_frames(self.chunks[-1], (shape[1], shape[0]), fps=self.fps, macro_block_size=2, ffmpeg_log_level='error')
+    self.writer.send(None) # Start the encoder process
+
+  def close(self) -> Optional[str]:
+    """Finish the current chunk, returning its path"""
+    if self.writer is None: return None
+    self.writer.close(); self.writer = None; return self.chunks[-1]
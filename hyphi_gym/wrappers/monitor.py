@@ -2,22 +2,32 @@ import time; import numpy as np; import warnings
 
 import gymnasium as gym
 from gymnasium.core import ActType, ObsType; 
-from typing import SupportsFloat
-from moviepy.video.io.ImageSequenceClip import ImageSequenceClip
+from typing import SupportsFloat, Optional, Union
 from hyphi_gym.utils.stdout_redirected import stdout_redirected
-from hyphi_gym.common.grid import Grid
+from hyphi_gym.utils.video import VideoStream
+from hyphi_gym.utils import timing
 
-from PIL import Image
+HISTORY = {'off': [], 'summary': ['rewards'], 'full': ['states', 'actions', 'rewards']} # Trajectory keys captured per mode
 
 class Monitor(gym.Wrapper[ObsType, ActType, ObsType, ActType]):
   """ A monitor wrapper for Gym environments, it is used to know the episode reward, length, time and other data.
+  Episode trajectories are captured in preallocated arrays and provided as `info['episode']['history']` according to `history`: 
+  `'full'` (states, actions and rewards), `'summary'` (rewards only), or `'off'`. 
+  Videos of every `episode_interval`-th episode are recorded rendering every `frame_interval`-th step, 
+  either buffered (`record_video=True`), or streamed to an encoder writing to a file (`record_video='path.mp4'`).
+  If `hyphi_gym.utils.timing` is enabled, episode infos hold the `timings` of their phases (see also `timings()`).
   :param env: The environment """
-  def __init__( self, env: gym.Env, record_video=False):
+  def __init__( self, env: gym.Env, record_video:Union[bool,str]=False, history='full', frame_interval=1, episode_interval=1):
     super().__init__(env=env); self.t_start = time.time(); 
-    self.discrete = isinstance(env.unwrapped, Grid); self.policy = 'MlpPolicy' if self.discrete else 'MultiInputPolicy'
-    self.record_video = record_video; self._frame_buffer = []
-    self.states: list = [np.ndarray]; self.actions:list = [np.ndarray]; self.rewards: list[float] = []
-    self._history = lambda: {key: np.array(getattr(self,key).copy()) for key in ['states','actions','rewards']}
+    self.discrete = isinstance(env.action_space, gym.spaces.Discrete); self.policy = 'MlpPolicy' if self.discrete else 'MultiInputPolicy'
+    self.record_video, self.frame_interval, self.episode_interval = record_video, frame_interval, episode_interval
+    self._frame_buffer, self._episodes, self._recording, self._timings = [], 0, False, {}
+    if isinstance(record_video, str): self._stream = VideoStream(record_video, env.metadata['render_fps'] / frame_interval) # Real-time playback
+    else: self._stream = None
+    assert history in HISTORY, f"Unknown history mode {history}, choose from {list(HISTORY)}"
+    self.history, self._length, self._return = history, 0, 0.0; steps = getattr(env.unwrapped, 'max_episode_steps', None) or 1000
+    spaces = {'states': env.observation_space, 'actions': env.action_space, 'rewards': gym.spaces.Box(-np.inf, np.inf, shape=(), dtype=np.float64)}
+    self._buffers = {key: np.zeros((0, *spaces[key].shape), dtype=spaces[key].dtype) for key in HISTORY[history]}; self._grow(steps + 1)
     self._episode_returns: list[float] = []; self._termination_reasons: list[str] = []
     self._episode_lengths: list[int] = []; self._episode_times: list[float] = []; 
     self._total_steps = 0; self.needs_reset = True
@@ -27,9 +37,12 @@ class Monitor(gym.Wrapper[ObsType, ActType, ObsType, ActType]):
     :param kwargs: Extra keywords saved for the next episode. only if defined by reset_keywords
     :return: the first observation of the environment """
     self.needs_reset = False
+    if timing.ENABLED: self._timings = timing.snapshot()
     state, info = self.env.reset(**kwargs)
-    self.rewards = []; self.states=[state]; self.actions = []
-    if self.record_video: self._frame_buffer.append(self.render())
+    self._length, self._return = 0, 0.0
+    if self._states is not None: self._states[0] = state
+    self._recording = bool(self.record_video) and self._episodes % self.episode_interval == 0; self._episodes += 1
+    self._capture()
     return state, info
 
   def step(self, action: ActType) -> tuple[ObsType, SupportsFloat, bool, bool, dict]:
@@ -38,11 +51,16 @@ class Monitor(gym.Wrapper[ObsType, ActType, ObsType, ActType]):
     :return: observation, reward, terminated, truncated, information """
     if self.needs_reset: raise RuntimeError("Tried to step environment that needs reset")
     state, reward, terminated, truncated, info = self.env.step(action)
-    self.states.append(state); self.actions.append(action); self.rewards.append(float(reward))
-    if self.record_video: self._frame_buffer.append(self.render())
+    if (n := self._length) + 1 >= self._capacity: self._grow()
+    if self._rewards is not None: self._rewards[n] = reward
+    if self._actions is not None: self._actions[n] = action
+    if self._states is not None and not (terminated or truncated): self._states[n+1] = state # Final states are excluded
+    self._length += 1; self._return += float(reward); self._capture()
     if terminated or truncated:
-      self.needs_reset = True; ep_rew = sum(self.rewards); ep_len = len(self.rewards); self.states.pop(-1)
-      ep_info = {"r": round(ep_rew, 6), "l": ep_len, "t": round(time.time() - self.t_start, 6), 'history': self._history()}
+      self.needs_reset = True; ep_rew = self._return; ep_len = self._length
+      ep_info = {"r": round(ep_rew, 6), "l": ep_len, "t": round(time.time() - self.t_start, 6)}
+      if self.history != 'off': ep_info['history'] = self._history()
+      if timing.ENABLED: ep_info['timings'] = timing.summary(since=self._timings)
       ep_info['reward_threshold'] = self.env.unwrapped.reward_threshold
       self._episode_returns.append(ep_rew); 
       self._termination_reasons.append(info.pop('termination_reason'))
@@ -51,23 +69,62 @@ class Monitor(gym.Wrapper[ObsType, ActType, ObsType, ActType]):
     self._total_steps += 1
     return state, reward, terminated, truncated, info
   
+  def _grow(self, capacity:int=0):
+    """Allocate the history buffers for `capacity` steps, doubling the current capacity by default"""
+    self._capacity = capacity or 2 * self._capacity
+    self._buffers = {key: np.concatenate([b, np.zeros((self._capacity - len(b), *b.shape[1:]), b.dtype)]) for key, b in self._buffers.items()}
+    self._states, self._actions, self._rewards = [self._buffers.get(key) for key in ['states', 'actions', 'rewards']]
+
+  def _history(self) -> dict[str, np.ndarray]:
+    """Copy the captured episode into a single contiguous block, returning a view for each key"""
+    views = {key: buffer[:self._length] for key, buffer in self._buffers.items()}
+    offsets = np.cumsum([0, *[-(-v.nbytes // 8) * 8 for v in views.values()]]); block = np.empty(offsets[-1], dtype=np.uint8)
+    history = {key: np.ndarray(v.shape, v.dtype, buffer=block, offset=o) for (key, v), o in zip(views.items(), offsets)}
+    for key, v in views.items(): history[key][...] = v
+    return history
+
+  @property
+  def states(self) -> np.ndarray: # Including the current state while running
+    return self._buffers['states'][:self._length + (not self.needs_reset)] if 'states' in self._buffers else np.zeros(0)
+
+  @property
+  def actions(self) -> np.ndarray: return self._buffers['actions'][:self._length] if 'actions' in self._buffers else np.zeros(0)
+
+  @property
+  def rewards(self) -> np.ndarray: return self._buffers['rewards'][:self._length] if 'rewards' in self._buffers else np.zeros(0)
+
+  def _capture(self):
+    """Render a frame of recorded episodes every `frame_interval` steps, streaming it if recording to a file"""
+    if not self._recording or self._length % self.frame_interval: return
+    if self._stream is not None: self._stream.write(self.render())
+    else: self._frame_buffer.append(self.render())
+
   def get_video(self, reset=True):
+    assert self._stream is None, f"Frames are streamed to {self._stream.path}"
     frame_buffer = self._frame_buffer.copy()
     if reset: self._frame_buffer = []
     return np.array(frame_buffer)
   
 
-  def save_video(self, path:str, reset=True):
-    """Saves current videobuffer to file"""
+  def save_video(self, path:Optional[str]=None, reset=True):
+    """Saves current videobuffer to file, or, if streaming, finishes the current chunk (further frames start a new one)"""
+    if self._stream is not None: self._stream.close(); return
+    assert path is not None, "Please provide a path to save the video to"
     with stdout_redirected(): 
       if '.gif' in path:
         from PIL import Image
         if isinstance(self._frame_buffer[0], np.ndarray): imgs = [Image.fromarray(img) for img in self._frame_buffer]
         else: imgs = [img for img in self._frame_buffer]
         imgs[0].save(path, save_all=True, append_images=imgs[1:], optimize=False, duration=1000/self.env.metadata['render_fps'], loop=0)
-      else: ImageSequenceClip(self._frame_buffer, fps=self.env.metadata['render_fps']).write_videofile(path)
+      else:
+        from moviepy.video.io.ImageSequenceClip import ImageSequenceClip
+        ImageSequenceClip(self._frame_buffer, fps=self.env.metadata['render_fps']).write_videofile(path)
     if reset: self._frame_buffer = []
 
+  def close(self):
+    if self._stream is not None: self._stream.close()
+    super().close()
+
   def write_video(self, writer, label, step):
     """Adds current videobuffer to tensorboard"""
     if len(self._frame_buffer) > 100: warnings.warn("Saving videos longer than one episode can be slow.")
@@ -76,10 +133,14 @@ class Monitor(gym.Wrapper[ObsType, ActType, ObsType, ActType]):
     # writer.add_video(label,video, global_step=step); self._frame_buffer = []
 
   def save_image(self, path)->None:
-    render = self.env.render(); assert render is not None
+    from PIL import Image; render = self.env.render(); assert render is not None
     if isinstance(render, np.ndarray): render = Image.fromarray(render)
     assert isinstance(render, Image.Image); render.save(path)
   
+  def timings(self) -> dict[str, dict]:
+    """Calls, total ms, mean µs, p50/p99 bounds and log2 histogram per phase recorded in this process"""
+    return timing.summary()
+
   @property
   def total_steps(self) -> int: return self._total_steps
 
@@ -0,0 +1,20 @@
+"""Checks of the name parsing of `hyphi_gym.named`, run via `python -m pytest test`"""
+import pytest; import gymnasium as gym; import hyphi_gym
+hyphi_gym.register_envs()
+
+@pytest.mark.parametrize('name', ['PointMaze9Fast', 'HoleyPlaneFast', 'FetchReachFast'])
+def test_fast_supported(name):
+  env = gym.make(**hyphi_gym.named(name), seed=0); assert env.unwrapped.physics == 'fast'; env.close()
+
+@pytest.mark.parametrize('name', ['Maze9Fast', 'HoleyGridFast', 'FlatGrid9Fast'])
+def test_fast_unsupported(name):
+  with pytest.raises(ValueError, match='Fast'): hyphi_gym.named(name)
+
+@pytest.mark.parametrize('name', ['Maze9Pixels', 'Mazes9Pixels', 'HoleyGridPixels', 'HoleyGrids9Pixels', 'FlatGrid9Pixels'])
+def test_pixels_supported(name):
+  env = gym.make(**hyphi_gym.named(name), seed=0); observation, _ = env.reset(seed=0)
+  assert env.unwrapped.obs_mode == 'pixels' and observation.shape == (64, 64, 3); env.close()
+
+@pytest.mark.parametrize('name', ['PointMaze9Pixels', 'HoleyPlanePixels', 'FetchReachPixels'])
+def test_pixels_unsupported(name):
+  with pytest.raises(ValueError, match='Pixels'): hyphi_gym.named(name)
@@ -0,0 +1,32 @@
+"""Checks of the MuJoCo-based simulations, run via `MUJOCO_GL=egl python -m pytest test`"""
+import os; os.environ.setdefault('MUJOCO_GL', 'egl')
+import numpy as np; import gymnasium as gym; import hyphi_gym
+hyphi_gym.register_envs()
+
+def test_render_after_target_respawn():
+  """Lazy kinematics render the respawned target of a continued Fetch task as eager kinematics do"""
+  frames = []
+  for lazy in [True, False]:
+    env = gym.make(**hyphi_gym.named('FetchReach'), render_mode='3D', seed=0).unwrapped; env.lazy = lazy
+    env.reset(seed=0); env._reset(env.layout); frames.append(env.render()); env.close()
+  assert np.array_equal(*frames)
+
+def test_site_velocity_after_step():
+  """Site velocities of the accessor match the Jacobian-based `get_site_xvelp` and `get_site_xvelr` after stepping"""
+  from hyphi_gym.utils.mujoco_utils import get_site_xvelp, get_site_xvelr
+  env = gym.make(**hyphi_gym.named('FetchReach'), seed=0).unwrapped; env.reset(seed=0)
+  for action in np.random.default_rng(0).uniform(-1, 1, (20, 4)):
+    env.step(action.astype(np.float32)); velp, velr = env.access.site_velocity('robot0:grip')
+    assert np.array_equal(velp, get_site_xvelp(env.model, env.data, 'robot0:grip'))
+    assert np.array_equal(velr, get_site_xvelr(env.model, env.data, 'robot0:grip'))
+
+def test_nearest_hole_paths():
+  """Default HoleyPlanes scan all holes, opting into the bucket index yields identical observations"""
+  observations = []
+  for bucket_holes in [None, 0]:
+    env = gym.make(**hyphi_gym.named('HoleyPlane'), seed=0, bucket_holes=bucket_holes); observation = [env.reset(seed=0)[0]]
+    assert (env.unwrapped.hole_buckets is not None) == (bucket_holes is not None)
+    observation += [env.step(action)[0] for action in np.random.default_rng(0).uniform(-1, 1, (100, 2))]; observations.append(observation)
+  assert np.array_equal(*observations)
+  for name in ['HoleyPlane', 'HoleyPlaneShift', 'HoleyPlanes15']:
+    env = gym.make(**hyphi_gym.named(name), seed=0); env.reset(seed=0); assert env.unwrapped.hole_buckets is None